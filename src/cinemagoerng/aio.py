@@ -0,0 +1,712 @@
+# Copyright 2026 H. Turgut Uyar <uyar@tekir.org>
+#
+# This file is part of CinemagoerNG.
+#
+# CinemagoerNG is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# CinemagoerNG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with CinemagoerNG.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import io
+import ssl
+import time
+import weakref
+from collections.abc import (
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    Mapping,
+)
+from contextlib import asynccontextmanager
+from functools import partial
+from types import TracebackType
+from typing import Any, TypeAlias, TypeVar
+from urllib.parse import SplitResult, urlsplit
+
+from . import hooks, metrics, model, web
+from .cache import CacheBackend, HTTPCache, MemoryCache, ResultCache
+from .piculet import Document
+from .session import (
+    CHUNK_SIZE,
+    MAX_REDIRECTS,
+    ContentDecoder,
+    RateLimiter,
+    Response,
+    Retry,
+    count_response,
+    retry_delay,
+)
+
+
+T = TypeVar("T")
+
+
+async def _call_cache(
+    backend: CacheBackend,
+    func: Callable[..., T],
+    /,
+    *args: Any,
+    **kwargs: Any,
+) -> T:
+    # persistent backends do file I/O, so they're used from other threads
+    if isinstance(backend, MemoryCache):
+        return func(*args, **kwargs)
+    return await asyncio.to_thread(func, *args, **kwargs)
+
+
+class _Connection:
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+async def _read_header_block(reader: asyncio.StreamReader) -> bytes:
+    lines: list[bytes] = []
+    while True:
+        line = await reader.readline()
+        if line in {b"\r\n", b"\n", b""}:
+            break
+        lines.append(line)
+    return b"".join(lines)
+
+
+async def _read_chunked(
+    reader: asyncio.StreamReader,
+) -> AsyncIterator[bytes]:
+    while True:
+        size_line = await reader.readline()
+        try:
+            size = int(size_line.split(b";", 1)[0].strip(), 16)
+        except ValueError:
+            raise ConnectionResetError(
+                f"Invalid chunk size line: {size_line!r}",
+            ) from None
+        if size == 0:
+            await _read_header_block(reader)  # trailers
+            return
+        yield await reader.readexactly(size)
+        await reader.readexactly(2)
+
+
+async def _read_sized(
+    reader: asyncio.StreamReader,
+    length: int,
+) -> AsyncIterator[bytes]:
+    remaining = length
+    while remaining > 0:
+        chunk = await reader.read(min(CHUNK_SIZE, remaining))
+        if len(chunk) == 0:
+            raise ConnectionResetError("Connection closed before end of body")
+        remaining -= len(chunk)
+        yield chunk
+
+
+async def _read_until_eof(
+    reader: asyncio.StreamReader,
+) -> AsyncIterator[bytes]:
+    while chunk := await reader.read(CHUNK_SIZE):
+        yield chunk
+
+
+class _Call:
+    def __init__(self, future: asyncio.Future[Any]) -> None:
+        self.future = future
+        self.waiters = 1
+        self.shared = False
+
+
+class AsyncSingleFlight:
+    """Group of awaitables where concurrent ones with the same key run once.
+
+    This is the asyncio counterpart
+    of :class:`cinemagoerng.session.SingleFlight`.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, _Call] = {}
+
+    def _forget(self, key: str, call: _Call, _: asyncio.Future[Any]) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(
+        self,
+        key: str,
+        func: Callable[[], Awaitable[T]],
+    ) -> tuple[T, bool]:
+        """Await a function once for all concurrent callers with a key.
+
+        The function runs in its own task, so cancelling a caller
+        doesn't cancel the others. The task is cancelled
+        when all of its callers are cancelled.
+        The second item of the result tells whether the result
+        is shared with other callers.
+        """
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.future.add_done_callback(partial(self._forget, key, call))
+        else:
+            call.waiters += 1
+            call.shared = True
+        try:
+            result: T = await asyncio.shield(call.future)
+        except asyncio.CancelledError:
+            call.waiters -= 1
+            if call.waiters == 0:
+                call.future.cancel()
+            raise
+        return result, call.shared
+
+
+class AsyncSession:
+    """Non-blocking HTTP/1.1 client that keeps connections alive.
+
+    This is the asyncio counterpart of :class:`cinemagoerng.session.Session`.
+    Connections are pooled per host and at most ``pool_size`` idle
+    connections are kept for each host. Requests are rate limited,
+    retried, cached, and coalesced like in synchronous sessions,
+    and a limiter can be shared with them. Cache backends other than
+    memory caches are used from worker threads, so that their I/O
+    doesn't block the event loop. A session must be used
+    from a single event loop.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = 16,
+        timeout: float | None = 30.0,
+        ssl_context: ssl.SSLContext | None = None,
+        limiter: RateLimiter | None = None,
+        retry: Retry | None = None,
+        cache: HTTPCache | None = None,
+        result_cache: ResultCache | None = None,
+    ) -> None:
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.ssl_context = ssl_context if ssl_context is not None else \
+            ssl.create_default_context()
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.retry = retry if retry is not None else Retry()
+        self.cache = cache
+        self.result_cache = result_cache
+        self.flights = AsyncSingleFlight()
+        self._idle: dict[tuple[str, str], list[_Connection]] = {}
+        self._closing: AsyncIterator[None] | None = None
+
+    async def __aenter__(self) -> AsyncSession:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.close()
+
+    async def _connect(self, parts: SplitResult) -> _Connection:
+        secure = parts.scheme == "https"
+        host = parts.hostname
+        port = parts.port if parts.port is not None else \
+            (443 if secure else 80)
+        reader, writer = await asyncio.open_connection(
+            host,
+            port,
+            ssl=self.ssl_context if secure else None,
+            server_hostname=host if secure else None,
+        )
+        return _Connection(reader, writer)
+
+    async def _exchange(
+        self,
+        conn: _Connection,
+        url: str,
+        parts: SplitResult,
+        headers: Mapping[str, str],
+    ) -> tuple[Response, bool]:
+        target = parts.path if len(parts.path) > 0 else "/"
+        if len(parts.query) > 0:
+            target += "?" + parts.query
+        lines = [f"GET {target} HTTP/1.1", f"Host: {parts.netloc}"]
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        request = "\r\n".join(lines) + "\r\n\r\n"
+        conn.writer.write(request.encode("latin-1"))
+        await conn.writer.drain()
+
+        reader = conn.reader
+        while True:
+            status_line = await reader.readline()
+            if len(status_line) == 0:
+                raise ConnectionResetError("Connection closed by server")
+            version, status_code, *_ = status_line.decode("latin-1").split()
+            status = int(status_code)
+            header_block = await _read_header_block(reader)
+            if status >= 200:
+                break
+        response_headers = http.client.parse_headers(io.BytesIO(header_block))
+
+        keep_alive = (version == "HTTP/1.1") and \
+            (response_headers.get("Connection", "").lower() != "close")
+        transfer_encoding = response_headers.get("Transfer-Encoding", "")
+        content_length = response_headers.get("Content-Length")
+        body: AsyncIterator[bytes]
+        if status in {204, 304}:
+            body = _read_sized(reader, 0)
+        elif "chunked" in transfer_encoding.lower():
+            body = _read_chunked(reader)
+        elif content_length is not None:
+            body = _read_sized(reader, int(content_length))
+        else:
+            keep_alive = False
+            body = _read_until_eof(reader)
+
+        decoder = ContentDecoder(response_headers.get("Content-Encoding"))
+        chunks = [decoder.decode(chunk) async for chunk in body]
+        chunks.append(decoder.flush())
+        response = Response(url=url, status=status, headers=response_headers,
+                            content=b"".join(chunks),
+                            received=decoder.received)
+        return response, keep_alive
+
+    async def _send(self, url: str, headers: Mapping[str, str]) -> Response:
+        parts = urlsplit(url)
+        if parts.scheme not in {"http", "https"}:
+            raise ValueError(f"Unsupported URL scheme: '{parts.scheme}'")
+        idle = self._idle.setdefault((parts.scheme, parts.netloc), [])
+        while True:
+            reused = len(idle) > 0
+            conn = idle.pop() if reused else None
+            try:
+                async with asyncio.timeout(self.timeout):
+                    if conn is None:
+                        conn = await self._connect(parts)
+                    response, keep_alive = await self._exchange(
+                        conn, url, parts, headers,
+                    )
+            except (ConnectionError, EOFError):
+                if conn is not None:
+                    conn.close()
+                if reused:  # the server might have closed an idle connection
+                    continue
+                raise
+            except BaseException:
+                if conn is not None:
+                    conn.close()
+                raise
+            if keep_alive and (len(idle) < self.pool_size):
+                idle.append(conn)
+            else:
+                conn.close()
+            return response
+
+    async def _send_with_retry(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+        retry: Retry,
+    ) -> Response:
+        host = urlsplit(url).hostname or ""
+        attempt = 0
+        while True:
+            await asyncio.sleep(self.limiter.reserve(host))
+            try:
+                response = await self._send(url, headers)
+                count_response(host, response.received)
+            except (ConnectionError, TimeoutError):
+                delay = retry_delay(retry, self.limiter, host=host,
+                                     attempt=attempt, response=None)
+                if delay is None:
+                    raise
+            else:
+                delay = retry_delay(retry, self.limiter, host=host,
+                                     attempt=attempt, response=response)
+                if delay is None:
+                    return response
+            metrics.RETRIES.inc(host=host)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _follow(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+        retry: Retry,
+    ) -> Response:
+        for _ in range(MAX_REDIRECTS + 1):
+            response = await self._send_with_retry(url, headers, retry)
+            redirect_url = response.redirect_url()
+            if redirect_url is None:
+                response.raise_for_status()
+                return response
+            url = redirect_url
+        raise response.error("Too many redirections")
+
+    async def get(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        ttl: float | None = None,
+        retry: Retry | None = None,
+    ) -> Response:
+        """Get the response for a URL, following redirections.
+
+        Compressed contents are decompressed according to the
+        "Content-Encoding" header. Error statuses raise
+        :class:`urllib.error.HTTPError`. Responses are cached
+        and retried like in synchronous sessions.
+        """
+        request_headers = headers if headers is not None else {}
+        policy = retry if retry is not None else self.retry
+        if self.cache is None:
+            return await self._follow(url, request_headers, policy)
+        cache = self.cache
+        key, entry = await _call_cache(cache.backend, cache.lookup, url,
+                                       request_headers)
+        if entry is not None:
+            if entry.fresh():
+                metrics.CACHE_LOOKUPS.inc(cache="http", result="hit")
+                return entry.response()
+            request_headers = request_headers | entry.validators()
+        response = await self._follow(url, request_headers, policy)
+        return await _call_cache(cache.backend, cache.update, key, entry,
+                                 response, ttl=ttl)
+
+    async def close(self) -> None:
+        """Close all idle connections."""
+        pools, self._idle = list(self._idle.values()), {}
+        for conn in (conn for idle in pools for conn in idle):
+            conn.close()
+
+
+_DEFAULT_SESSIONS: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop,
+    AsyncSession,
+] = weakref.WeakKeyDictionary()
+
+
+async def _closing(session: AsyncSession) -> AsyncIterator[None]:
+    # the loop finalizes its asynchronous generators when it shuts down
+    try:
+        yield
+    finally:
+        _DEFAULT_SESSIONS.pop(asyncio.get_running_loop(), None)
+        await session.close()
+
+
+def _drop_closed_loops() -> None:
+    # the sessions of loops that were closed without finalizing
+    # their asynchronous generators refer to their loops
+    for loop in [loop for loop in _DEFAULT_SESSIONS if loop.is_closed()]:
+        del _DEFAULT_SESSIONS[loop]
+
+
+async def default_session() -> AsyncSession:
+    """Get the session that is used when no session is given.
+
+    Since connections can't be shared between event loops, there is
+    a default session for each loop. It gets closed when the loop
+    shuts down its asynchronous generators, as in :func:`asyncio.run`.
+    Otherwise, it's dropped when a default session is next created
+    after the loop is closed.
+    """
+    loop = asyncio.get_running_loop()
+    session = _DEFAULT_SESSIONS.get(loop)
+    if session is None:
+        _drop_closed_loops()
+        session = AsyncSession()
+        session._closing = _closing(session)
+        await anext(session._closing)
+        _DEFAULT_SESSIONS[loop] = session
+    return session
+
+
+@asynccontextmanager
+async def _using(session: AsyncSession | None) -> AsyncIterator[AsyncSession]:
+    yield session if session is not None else await default_session()
+
+
+async def fetch(
+    url: str,
+    /,
+    *,
+    headers: dict[str, str] | None = None,
+    session: AsyncSession | None = None,
+    ttl: float | None = None,
+    retry: Retry | None = None,
+) -> bytes:
+    request_headers = web.fetch_headers(headers)
+    async with _using(session) as client:
+        response = await client.get(url, headers=request_headers, ttl=ttl,
+                                    retry=retry)
+    charset = response.headers.get_content_charset()
+    return web.as_utf8(response.content, charset)
+
+
+AsyncTransport: TypeAlias = Callable[[web.Request], Awaitable[web.Reply]]
+
+
+async def run(flow: web.Flow[T], transport: AsyncTransport) -> T:
+    """Run a flow, awaiting the responses to its requests from a transport.
+
+    Errors raised by the transport are thrown into the flow.
+    """
+    try:
+        request = next(flow)
+        while True:
+            if request.delay > 0:
+                await asyncio.sleep(request.delay)
+            try:
+                document = await transport(request)
+            except Exception as e:
+                request = flow.throw(e)
+            else:
+                request = flow.send(document)
+    except StopIteration as stop:
+        return stop.value
+
+
+# references to the background refreshes, so they don't get collected
+_refreshes: set[asyncio.Task[None]] = set()
+
+
+def _cached_transport(
+    transport: AsyncTransport,
+    cache: ResultCache,
+) -> AsyncTransport:
+    async def refresh(request: web.Request, key: str) -> None:
+        try:
+            data = request.parse(await transport(request))
+            await _call_cache(cache.backend, cache.set, key, data,
+                              ttl=request.spec.cache_ttl)
+        except Exception:  # failed refreshes leave the entry stale
+            pass
+        finally:
+            cache.release_refresh(key)
+
+    async def get(request: web.Request) -> web.Reply:
+        key = web.result_key(request)
+        data, stale = await _call_cache(cache.backend, cache.get, key)
+        if data is None:
+            data = request.parse(await transport(request))
+            await _call_cache(cache.backend, cache.set, key, data,
+                              ttl=request.spec.cache_ttl)
+        elif stale and cache.claim_refresh(key):
+            task = asyncio.create_task(refresh(request, key))
+            _refreshes.add(task)
+            task.add_done_callback(_refreshes.discard)
+        return web.Parsed(data)
+
+    return get
+
+
+def _coalesced_transport(
+    transport: AsyncTransport,
+    flights: AsyncSingleFlight,
+) -> AsyncTransport:
+    async def parse(request: web.Request) -> dict[str, Any]:
+        return request.parse(await transport(request))
+
+    async def get(request: web.Request) -> web.Reply:
+        data, shared = await flights.do(web.result_key(request),
+                                        partial(parse, request))
+        return web.coalesced_reply(data, shared)
+
+    return get
+
+
+def _transport(session: AsyncSession) -> AsyncTransport:
+    async def fetch_request(request: web.Request) -> Document:
+        if not hooks.observers:
+            return await fetch(request.url, headers=dict(request.headers),
+                               session=session, ttl=request.spec.cache_ttl,
+                               retry=request.retry)
+        start = time.perf_counter()
+        document = await fetch(request.url, headers=dict(request.headers),
+                               session=session, ttl=request.spec.cache_ttl,
+                               retry=request.retry)
+        web.observe_fetch(request, document, time.perf_counter() - start)
+        return document
+
+    transport = _coalesced_transport(fetch_request, session.flights)
+    if session.result_cache is None:
+        return transport
+    return _cached_transport(transport, session.result_cache)
+
+
+async def _gather(*awaitables: Awaitable[Any]) -> list[Any]:
+    """Await concurrently, cancelling the others when one fails."""
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+
+async def get_title(
+    imdb_id: str,
+    *,
+    fields: Iterable[str] | None = None,
+    lazy: bool = False,
+    include: Iterable[str] = (),
+    headers: dict[str, str] | None = None,
+    session: AsyncSession | None = None,
+) -> model.Title:
+    """Get a title from its reference page.
+
+    The pages for the extra data selected in ``include``
+    are fetched concurrently with the reference page.
+    """
+    updates = web.check_updates(include)
+    flow = web.title_flow(imdb_id, fields=fields, lazy=lazy, headers=headers)
+    async with _using(session) as client:
+        transport = _transport(client)
+        if len(updates) == 0:
+            return await run(flow, transport)
+        placeholder, flows = web.update_flows(imdb_id, updates, headers)
+        title, *_ = await _gather(
+            run(flow, transport),
+            *(run(update_flow, transport) for update_flow in flows),
+        )
+    assert isinstance(title, model.Title), title
+    web.apply_updates(title, placeholder, updates)
+    return title
+
+
+async def set_taglines(
+    title: model.Title,
+    *,
+    headers: dict[str, str] | None = None,
+    session: AsyncSession | None = None,
+) -> None:
+    async with _using(session) as client:
+        flow = web.taglines_flow(title, headers=headers)
+        await run(flow, _transport(client))
+
+
+async def set_akas(
+    title: model.Title,
+    *,
+    cursor: str | None = None,
+    headers: dict[str, str] | None = None,
+    session: AsyncSession | None = None,
+) -> None:
+    async with _using(session) as client:
+        flow = web.akas_flow(title, cursor=cursor, headers=headers)
+        await run(flow, _transport(client))
+
+
+async def _iter_pages(
+    paginator: web.Paginator,
+    transport: AsyncTransport,
+) -> AsyncIterator[list[Any]]:
+    while (items := await run(web.paginated_flow(paginator),
+                              transport)) is not None:
+        yield items
+
+
+async def iter_akas(
+    title: model.Title,
+    *,
+    cursor: str | None = None,
+    headers: dict[str, str] | None = None,
+    session: AsyncSession | None = None,
+) -> AsyncIterator[model.AKA]:
+    """Generate the AKAs of a title, getting one page at a time."""
+    paginator = web.akas_paginator(title, cursor=cursor, headers=headers)
+    async with _using(session) as client:
+        async for items in _iter_pages(paginator, _transport(client)):
+            for aka in web.akas_page(paginator, items):
+                yield aka
+
+
+async def iter_episodes(
+    title: model.Title,
+    *,
+    season: str,
+    cursor: str | None = None,
+    headers: dict[str, str] | None = None,
+    session: AsyncSession | None = None,
+) -> AsyncIterator[model.Title]:
+    """Generate the episodes of a season, getting one page at a time."""
+    paginator = web.episodes_paginator(title, season=season, cursor=cursor,
+                                       headers=headers)
+    async with _using(session) as client:
+        async for items in _iter_pages(paginator, _transport(client)):
+            for episode in web.episodes_page(title, paginator, items):
+                yield episode
+
+
+async def set_parental_guide(
+    title: model.Title,
+    *,
+    headers: dict[str, str] | None = None,
+    session: AsyncSession | None = None,
+) -> None:
+    async with _using(session) as client:
+        flow = web.parental_guide_flow(title, headers=headers)
+        await run(flow, _transport(client))
+
+
+async def set_episodes(
+    title: model.Title,
+    *,
+    season: str,
+    headers: dict[str, str] | None = None,
+    session: AsyncSession | None = None,
+) -> None:
+    async with _using(session) as client:
+        flow = web.episodes_flow(title, season=season, headers=headers)
+        await run(flow, _transport(client))
+
+
+async def set_all_episodes(
+    title: model.Title,
+    *,
+    max_concurrency: int = 4,
+    headers: dict[str, str] | None = None,
+    session: AsyncSession | None = None,
+) -> None:
+    """Set the episodes of all seasons of a series, concurrently.
+
+    At most ``max_concurrency`` seasons are fetched at a time.
+    """
+    if title.seasons is None:
+        return
+    if title.episodes is None:
+        title.episodes = {}
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def set_season(season: str) -> None:
+        async with semaphore:
+            flow = web.episodes_flow(title, season=season, headers=headers)
+            await run(flow, transport)
+
+    async with _using(session) as client:
+        transport = _transport(client)
+        await _gather(*(set_season(s) for s in title.seasons))
@@ -0,0 +1,462 @@
+# Copyright 2026 H. Turgut Uyar <uyar@tekir.org>
+#
+# This file is part of CinemagoerNG.
+#
+# CinemagoerNG is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# CinemagoerNG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with CinemagoerNG.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import hashlib
+import http.client
+import io
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Protocol
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from . import metrics
+from .session import Response
+
+
+IGNORED_VARIABLES = frozenset({
+    "isAutoTranslationEnabled",
+    "locale",
+    "originalTitleText",
+})
+"""GraphQL variables that don't take part in cache keys."""
+
+IGNORED_HEADERS = frozenset({"user-agent", "accept-encoding"})
+"""Request headers that don't take part in cache keys."""
+
+_STORED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def cache_key(url: str, headers: Mapping[str, str] | None = None) -> str:
+    """Get the cache key for a request.
+
+    Query parameters are sorted, and ignored GraphQL variables
+    and request headers are left out.
+    """
+    parts = urlsplit(url)
+    params = []
+    for name, value in parse_qsl(parts.query, keep_blank_values=True):
+        if name == "variables":
+            variables = {k: v for k, v in json.loads(value).items()
+                         if k not in IGNORED_VARIABLES}
+            value = json.dumps(variables, sort_keys=True,
+                               separators=(",", ":"))
+        params.append((name, value))
+    query = urlencode(sorted(params))
+    key = urlunsplit((parts.scheme, parts.netloc, parts.path, query, ""))
+    key_headers = sorted(
+        (name.lower(), value)
+        for name, value in (headers if headers is not None else {}).items()
+        if name.lower() not in IGNORED_HEADERS
+    )
+    lines = [key] + [f"{name}: {value}" for name, value in key_headers]
+    return "\n".join(lines)
+
+
+def _digest(key: str) -> str:
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+@dataclass(kw_only=True)
+class CacheEntry:
+    url: str
+    content: bytes
+    headers: dict[str, str]
+    stored: float
+    ttl: float
+
+    @property
+    def size(self) -> int:
+        return len(self.content) + sum(len(k) + len(v)
+                                       for k, v in self.headers.items())
+
+    def fresh(self, now: float | None = None) -> bool:
+        now = now if now is not None else time.time()
+        return now < self.stored + self.ttl
+
+    def validators(self) -> dict[str, str]:
+        """Get the headers for revalidating this entry."""
+        validators = {}
+        if "ETag" in self.headers:
+            validators["If-None-Match"] = self.headers["ETag"]
+        if "Last-Modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["Last-Modified"]
+        return validators
+
+    def response(self) -> Response:
+        block = "".join(f"{k}: {v}\r\n" for k, v in self.headers.items())
+        headers = http.client.parse_headers(
+            io.BytesIO(block.encode("latin-1") + b"\r\n"),
+        )
+        return Response(url=self.url, status=200, headers=headers,
+                        content=self.content)
+
+    def metadata(self) -> dict[str, object]:
+        data = asdict(self)
+        del data["content"]
+        return data
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> CacheEntry | None: ...
+
+    def set(self, key: str, entry: CacheEntry) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryCache:
+    """Cache that keeps the least recently used entries in memory.
+
+    The total size of the entries is kept under ``max_bytes``.
+    """
+
+    def __init__(self, *, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= old.size
+            if entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.size += entry.size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.size -= entry.size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class DiskCache:
+    """Cache that keeps entries in files under a directory.
+
+    The least recently used files are removed to keep the total size
+    under ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        paths = sorted(self.directory.glob("*.entry"),
+                       key=lambda p: p.stat().st_mtime)
+        self._sizes: OrderedDict[str, int] = OrderedDict(
+            (path.stem, path.stat().st_size) for path in paths
+        )
+        self.size = sum(self._sizes.values())
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.entry"
+
+    def get(self, key: str) -> CacheEntry | None:
+        name = _digest(key)
+        with self._lock:
+            if name not in self._sizes:
+                return None
+            path = self._path(name)
+            try:
+                data = path.read_bytes()
+            except FileNotFoundError:
+                self.size -= self._sizes.pop(name)
+                return None
+            self._sizes.move_to_end(name)
+            os.utime(path)
+        metadata, _, content = data.partition(b"\n")
+        return CacheEntry(content=content, **json.loads(metadata))
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        name = _digest(key)
+        data = json.dumps(entry.metadata()).encode("utf-8") + b"\n" + \
+            entry.content
+        with self._lock:
+            if name in self._sizes:
+                self.size -= self._sizes.pop(name)
+            if len(data) > self.max_bytes:
+                self._path(name).unlink(missing_ok=True)
+                return
+            temp = self.directory / f"{name}.{threading.get_ident()}.tmp"
+            temp.write_bytes(data)
+            temp.replace(self._path(name))
+            self._sizes[name] = len(data)
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                evicted, size = self._sizes.popitem(last=False)
+                self._path(evicted).unlink(missing_ok=True)
+                self.size -= size
+
+    def delete(self, key: str) -> None:
+        name = _digest(key)
+        with self._lock:
+            if name in self._sizes:
+                self.size -= self._sizes.pop(name)
+            self._path(name).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            for name in self._sizes:
+                self._path(name).unlink(missing_ok=True)
+            self._sizes.clear()
+            self.size = 0
+
+
+class SQLiteCache:
+    """Cache that keeps entries in an SQLite database.
+
+    The least recently used entries are removed to keep the total size
+    under ``max_bytes``.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        *,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, metadata TEXT, content BLOB,"
+            " size INTEGER, accessed REAL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed"
+            " ON entries (accessed)"
+        )
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT metadata, content FROM entries WHERE key = ?", (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        metadata, content = row
+        return CacheEntry(content=content, **json.loads(metadata))
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        with self._lock:
+            if entry.size > self.max_bytes:
+                self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (key, json.dumps(entry.metadata()), entry.content,
+                 entry.size, time.time()),
+            )
+            (size,) = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM entries",
+            ).fetchone()
+            if size <= self.max_bytes:
+                return
+            evicted = []
+            rows = self._db.execute(
+                "SELECT key, size FROM entries ORDER BY accessed",
+            ).fetchall()
+            for row_key, row_size in rows:
+                if size <= self.max_bytes:
+                    break
+                evicted.append((row_key,))
+                size -= row_size
+            self._db.executemany("DELETE FROM entries WHERE key = ?", evicted)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class HTTPCache:
+    """Cache for the responses of a session.
+
+    Entries are fresh for the TTL that's given when they are stored,
+    or for ``ttl`` seconds. Stale entries are revalidated using
+    their "ETag" and "Last-Modified" headers.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        *,
+        ttl: float = 3600.0,
+    ) -> None:
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttl = ttl
+
+    def lookup(
+        self,
+        url: str,
+        headers: Mapping[str, str],
+    ) -> tuple[str, CacheEntry | None]:
+        key = cache_key(url, headers)
+        return key, self.backend.get(key)
+
+    def update(
+        self,
+        key: str,
+        entry: CacheEntry | None,
+        response: Response,
+        *,
+        ttl: float | None = None,
+    ) -> Response:
+        """Store a response and get the response to use.
+
+        A "not modified" response refreshes the stored entry,
+        and the stored response is used instead.
+        """
+        ttl = ttl if ttl is not None else self.ttl
+        if (response.status == 304) and (entry is not None):
+            metrics.CACHE_LOOKUPS.inc(cache="http", result="revalidated")
+            entry.stored = time.time()
+            entry.ttl = ttl
+            self.backend.set(key, entry)
+            return entry.response()
+        metrics.CACHE_LOOKUPS.inc(cache="http", result="miss")
+        cache_control = response.headers.get("Cache-Control", "").lower()
+        if (response.status == 200) and ("no-store" not in cache_control):
+            headers = {name: value for name in _STORED_HEADERS
+                       if (value := response.headers.get(name)) is not None}
+            stored = CacheEntry(url=response.url, content=response.content,
+                                headers=headers, stored=time.time(), ttl=ttl)
+            self.backend.set(key, stored)
+        return response
+
+
+class ResultCache:
+    """Cache for the data scraped from pages.
+
+    Entries are fresh for the TTL that's given when they are stored,
+    or for ``ttl`` seconds. After that, they can still be used
+    for ``stale_ttl`` seconds while they are refreshed in the background.
+    The data is pickled, so a persistent backend must not be shared
+    with untrusted parties.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend | None = None,
+        *,
+        ttl: float = 3600.0,
+        stale_ttl: float = 86400.0,
+    ) -> None:
+        self.backend = backend if backend is not None else MemoryCache()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._refreshing: set[str] = set()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[dict[str, Any] | None, bool]:
+        """Get the data for a key, and whether it has to be refreshed.
+
+        Expired entries are not returned.
+        """
+        entry = self.backend.get(key)
+        now = time.time()
+        if (entry is not None) and entry.fresh(now):
+            metrics.CACHE_LOOKUPS.inc(cache="result", result="hit")
+            return pickle.loads(entry.content), False
+        if (entry is not None) and \
+                (now < entry.stored + entry.ttl + self.stale_ttl):
+            metrics.CACHE_LOOKUPS.inc(cache="result", result="stale")
+            return pickle.loads(entry.content), True
+        metrics.CACHE_LOOKUPS.inc(cache="result", result="miss")
+        return None, False
+
+    def set(
+        self,
+        key: str,
+        data: dict[str, Any],
+        *,
+        ttl: float | None = None,
+    ) -> None:
+        """Store the data for a key.
+
+        Empty data is not stored, since nothing is scraped
+        from error replies.
+        """
+        if len(data) == 0:
+            return
+        content = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        entry = CacheEntry(url=key, content=content, headers={},
+                           stored=time.time(),
+                           ttl=ttl if ttl is not None else self.ttl)
+        self.backend.set(key, entry)
+
+    def claim_refresh(self, key: str) -> bool:
+        """Claim the refreshing of a key, unless it's already claimed."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+            return True
+
+    def release_refresh(self, key: str) -> None:
+        with self._lock:
+            self._refreshing.discard(key)
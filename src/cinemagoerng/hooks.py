@@ -0,0 +1,94 @@
+# Copyright 2026 H. Turgut Uyar <uyar@tekir.org>
+#
+# This file is part of CinemagoerNG.
+#
+# CinemagoerNG is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# CinemagoerNG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with CinemagoerNG.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Literal, TypeAlias
+
+
+Stage: TypeAlias = Literal[
+    "network",
+    "build_tree",
+    "preprocess",
+    "extract",
+    "postprocess",
+    "deserialize",
+]
+
+
+@dataclass(frozen=True, kw_only=True)
+class StageEvent:
+    """Report of a stage of scraping a page.
+
+    The start time is in seconds since the epoch, and the duration
+    is in seconds. The size is the number of bytes of the document
+    for the network and tree building stages.
+    """
+
+    stage: Stage
+    spec: str
+    started: float
+    duration: float
+    size: int | None = None
+    url: str | None = None
+
+
+Observer: TypeAlias = Callable[[StageEvent], None]
+
+observers: list[Observer] = []
+"""Registered observers.
+
+The stages are not timed when the list is empty.
+"""
+
+
+def add_observer(observer: Observer) -> None:
+    """Register an observer to get the events of all stages."""
+    observers.append(observer)
+
+
+def remove_observer(observer: Observer) -> None:
+    observers.remove(observer)
+
+
+def notify(event: StageEvent) -> None:
+    for observer in observers:
+        observer(event)
+
+
+class SpanObserver:
+    """Observer that records stages as spans of an OpenTelemetry tracer.
+
+    Any object with the ``start_span`` method of OpenTelemetry tracers
+    can be used, so OpenTelemetry is not required.
+    """
+
+    def __init__(self, tracer: Any, *, prefix: str = "cinemagoerng") -> None:
+        self.tracer = tracer
+        self.prefix = prefix
+
+    def __call__(self, event: StageEvent) -> None:
+        attributes: dict[str, str | int] = {"cinemagoerng.spec": event.spec}
+        if event.size is not None:
+            attributes["cinemagoerng.size"] = event.size
+        if event.url is not None:
+            attributes["url.full"] = event.url
+        start = int(event.started * 1e9)
+        span = self.tracer.start_span(f"{self.prefix}.{event.stage}",
+                                      attributes=attributes, start_time=start)
+        span.end(end_time=start + int(event.duration * 1e9))
@@ -0,0 +1,261 @@
+# Copyright 2026 H. Turgut Uyar <uyar@tekir.org>
+#
+# This file is part of CinemagoerNG.
+#
+# CinemagoerNG is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# CinemagoerNG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with CinemagoerNG.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+"""Upper bounds of the histogram buckets, in seconds."""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n") \
+        .replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _format_labels(pairs: Iterable[tuple[str, str]]) -> str:
+    labels = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return f"{{{labels}}}" if len(labels) > 0 else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class _Metric(ABC):
+    type_ = ""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        if labels.keys() != set(self.labels):
+            raise ValueError(f"Labels of {self.name} must be: "
+                             f"{', '.join(self.labels)}")
+        return tuple(labels[name] for name in self.labels)
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        """Generate the sample lines of this metric."""
+
+    def render(self) -> str:
+        """Render this metric in the Prometheus text format."""
+        lines = [f"# HELP {self.name} {_escape_help(self.documentation)}",
+                 f"# TYPE {self.name} {self.type_}"]
+        lines.extend(self._samples())
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Metric):
+    """Metric that counts things, per combination of label values."""
+
+    type_ = "counter"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be increased")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        key = self._key(labels)
+        with self._lock:
+            return self._values.get(key, 0.0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            labels = _format_labels(zip(self.labels, key))
+            yield f"{self.name}{labels} {_format_value(value)}"
+
+
+class _Buckets:
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    """Metric that counts observations in buckets of upper bounds."""
+
+    type_ = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        *,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        self._values: dict[tuple[str, ...], _Buckets] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = _Buckets(len(self.buckets) + 1)
+                self._values[key] = data
+            data.counts[index] += 1
+            data.sum += value
+            data.count += 1
+
+    def get(self, **labels: str) -> tuple[int, float]:
+        """Get the number and the sum of the observations."""
+        key = self._key(labels)
+        with self._lock:
+            data = self._values.get(key)
+            return (data.count, data.sum) if data is not None else (0, 0.0)
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(
+                (key, list(data.counts), data.sum, data.count)
+                for key, data in self._values.items()
+            )
+        bounds = [*self.buckets, math.inf]
+        for key, counts, total, count in values:
+            pairs = list(zip(self.labels, key))
+            cumulative = 0
+            for bound, bucket_count in zip(bounds, counts):
+                cumulative += bucket_count
+                labels = _format_labels(pairs + [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(pairs)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {count}"
+
+
+class Registry:
+    """Collection of metrics that are rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> None:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: '{metric.name}'")
+            self._metrics[metric.name] = metric
+
+    def counter(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+    ) -> Counter:
+        counter = Counter(name, documentation, labels)
+        self.register(counter)
+        return counter
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Iterable[str] = (),
+        *,
+        buckets: Iterable[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        histogram = Histogram(name, documentation, labels, buckets=buckets)
+        self.register(histogram)
+        return histogram
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "".join(metric.render() for metric in metrics)
+
+
+REGISTRY = Registry()
+"""Registry of the metrics of the library."""
+
+REQUESTS = REGISTRY.counter(
+    "cinemagoerng_requests_total",
+    "HTTP requests sent, per host.",
+    ["host"],
+)
+RESPONSE_BYTES = REGISTRY.counter(
+    "cinemagoerng_response_bytes_total",
+    "Bytes of response contents received before decompression, per host.",
+    ["host"],
+)
+RETRIES = REGISTRY.counter(
+    "cinemagoerng_retries_total",
+    "HTTP requests retried after transient errors, per host.",
+    ["host"],
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "cinemagoerng_cache_lookups_total",
+    "Cache lookups, per cache and result (hit, stale, revalidated, miss).",
+    ["cache", "result"],
+)
+PARSE_SECONDS = REGISTRY.histogram(
+    "cinemagoerng_parse_seconds",
+    "Time spent scraping documents, per spec.",
+    ["spec"],
+)
+DESERIALIZE_SECONDS = REGISTRY.histogram(
+    "cinemagoerng_deserialize_seconds",
+    "Time spent generating objects from scraped data, per spec.",
+    ["spec"],
+)
+
+
+def render(registry: Registry | None = None) -> str:
+    """Render the metrics in the Prometheus text exposition format.
+
+    If no registry is given, the metrics of the library are rendered.
+    """
+    return (registry if registry is not None else REGISTRY).render()
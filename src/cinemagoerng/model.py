@@ -16,6 +16,10 @@
 
 from __future__ import annotations
 
+import sys
+import threading
+import weakref
+from collections.abc import Callable
 from dataclasses import KW_ONLY, dataclass, field
 from datetime import date
 from decimal import Decimal
@@ -29,13 +33,13 @@ from . import linguistics, lookup
 norepr = partial(field, repr=False)
 
 
-@dataclass
+@dataclass(slots=True)
 class Person:
     imdb_id: str
     name: str
 
 
-@dataclass
+@dataclass(slots=True)
 class _Credit:
     person: Person
     _: KW_ONLY
@@ -59,19 +63,19 @@ class _Credit:
         return "uncredited" in self.notes
 
 
-@dataclass
+@dataclass(slots=True)
 class CrewCredit(_Credit):
     _: KW_ONLY
     job: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class CastCredit(_Credit):
     _: KW_ONLY
     characters: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class AKA:
     title: str
     _: KW_ONLY
@@ -166,6 +170,17 @@ EPISODE_ATTRS: frozenset[str] = frozenset({
 })
 
 
+LAZY_ATTRS: frozenset[str] = frozenset({
+    "cast",
+    "crew",
+    "directors",
+    "writers",
+    "producers",
+    "thanks",
+    "plot_summaries",
+})
+
+
 UNSUPPORTED_ATTRS: dict[TitleType, frozenset[str]] = {
     TitleType.MOVIE: SERIES_ATTRS | EPISODE_ATTRS,
     TitleType.SHORT: SERIES_ATTRS | EPISODE_ATTRS,
@@ -231,17 +246,28 @@ class Title:
     certification: Certification | None = norepr(default=None)
     advisories: Advisories | None = norepr(default=None)
 
+    def __new__(cls, *args: Any, **kwargs: Any) -> Title:
+        # instances are created from the class specific to their type,
+        # which blocks the attributes the type doesn't support
+        type_id = kwargs.get("type_id")
+        title_class = _TITLE_CLASSES.get(type_id, cls) \
+            if type_id is not None else cls
+        return super().__new__(title_class)
+
     def __post_init__(self) -> None:
-        type_id = super().__getattribute__("type_id")
-        for attr in UNSUPPORTED_ATTRS[type_id]:
-            if super().__getattribute__(attr) is not None:
-                raise TypeError(f"'{type_id}' takes no argument '{attr}'")
+        values = self.__dict__
+        for attr in UNSUPPORTED_ATTRS[self.type_id]:
+            if values[attr] is not None:
+                raise TypeError(f"'{self.type_id}' takes no argument '{attr}'")
 
-    def __getattribute__(self, name: str, /) -> Any:
-        type_id = super().__getattribute__("type_id")
-        if name in UNSUPPORTED_ATTRS[type_id]:
-            raise AttributeError(f"'{type_id}' has no attribute '{name}'")
-        return super().__getattribute__(name) if name != "type_id" else type_id
+    def __reduce__(self) -> tuple[Any, ...]:
+        self.load_deferred()
+        return _new_title, (self.type_id,), self.__dict__
+
+    def load_deferred(self) -> None:
+        """Load the values of all deferred attributes."""
+        for attr in list(_PENDING.get(id(self), ())):
+            getattr(self, attr)
 
     @property
     def countries(self) -> list[str]:
@@ -266,5 +292,166 @@ class Title:
         return self.title
 
 
+class _UnsupportedAttr:
+    """Descriptor for an attribute that a type of title doesn't have.
+
+    The value is still stored in the instance for the type check
+    after initialization, but it can't be read.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Title | None, owner: type | None = None) -> Any:
+        if obj is None:
+            return self
+        raise AttributeError(f"'{obj.type_id}' has no attribute '{self.name}'")
+
+    def __set__(self, obj: Title, value: Any) -> None:
+        obj.__dict__[self.name] = value
+
+
+# loaders of the deferred attributes of titles, by the IDs of the titles;
+# they are kept out of the titles so that the instance dictionaries
+# contain only field values
+_PENDING: dict[int, dict[str, Callable[[], Any]]] = {}
+_PENDING_LOCK = threading.Lock()
+
+
+class _LazyAttr:
+    """Descriptor for an attribute that gets loaded on first access.
+
+    Since this is a non-data descriptor, the loaded value shadows it.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Title | None, owner: type | None = None) -> Any:
+        if obj is None:
+            return self
+        values = obj.__dict__
+        with _PENDING_LOCK:
+            pending = _PENDING.get(id(obj), {})
+            load = pending.get(self.name)
+        if load is None:
+            if self.name in values:  # loaded by another thread
+                return values[self.name]
+            raise AttributeError(f"'Title' has no attribute '{self.name}'")
+        value = values.setdefault(self.name, load())
+        with _PENDING_LOCK:
+            pending.pop(self.name, None)
+            if len(pending) == 0:
+                _PENDING.pop(id(obj), None)
+        return value
+
+
+def defer(title: Title, attr: str, load: Callable[[], Any]) -> None:
+    """Replace an attribute of a title with a loader for its value.
+
+    The loader will be called when the attribute is first accessed.
+    """
+    if attr not in LAZY_ATTRS:
+        raise ValueError(f"Attribute '{attr}' can't be deferred")
+    title.__dict__.pop(attr, None)
+    key = id(title)
+    with _PENDING_LOCK:
+        pending = _PENDING.get(key)
+        if pending is None:
+            pending = _PENDING[key] = {}
+            weakref.finalize(title, _PENDING.pop, key, None)
+        pending[attr] = load
+
+
+def _make_title_class(attrs: frozenset[str]) -> type[Title]:
+    namespace: dict[str, Any] = {
+        "__module__": Title.__module__,
+        "__qualname__": Title.__qualname__,
+    }
+    for attr in LAZY_ATTRS:
+        namespace[attr] = _LazyAttr(attr)
+    for attr in attrs:
+        namespace[attr] = _UnsupportedAttr(attr)
+    return type(Title.__name__, (Title,), namespace)
+
+
+_TITLE_CLASSES: dict[TitleType, type[Title]] = {
+    type_id: _make_title_class(attrs)
+    for type_id, attrs in UNSUPPORTED_ATTRS.items()
+}
+
+
+def _new_title(type_id: TitleType) -> Title:
+    return object.__new__(_TITLE_CLASSES[type_id])
+
+
 def make_movie(*args: Any, **kwargs: Any) -> Title:
     return Title(type_id=TitleType.MOVIE, *args, **kwargs)
+
+
+class Interner:
+    """Registry for sharing equal persons and strings between titles.
+
+    Interning a title replaces its persons with the equal ones
+    that were seen before, and interns its repeating strings,
+    such as genres, country codes and jobs. Since the persons
+    are shared, they should not be modified afterwards.
+    """
+
+    def __init__(self) -> None:
+        self._persons: dict[tuple[str, str], Person] = {}
+
+    def __len__(self) -> int:
+        return len(self._persons)
+
+    def person(self, person: Person) -> Person:
+        key = (person.imdb_id, person.name)
+        known = self._persons.get(key)
+        if known is not None:
+            return known
+        person.imdb_id = sys.intern(person.imdb_id)
+        self._persons[key] = person
+        return person
+
+    def _strings(self, values: list[str]) -> None:
+        for i, value in enumerate(values):
+            values[i] = sys.intern(value)
+
+    def _credits(self, items: list[CastCredit] | list[CrewCredit]) -> None:
+        for credit in items:
+            credit.person = self.person(credit.person)
+            self._strings(credit.notes)
+            if isinstance(credit, CrewCredit) and (credit.job is not None):
+                credit.job = sys.intern(credit.job)
+
+    def title(self, title: Title) -> Title:
+        """Intern the persons and the repeating strings of a title."""
+        self._strings(title.genres)
+        self._strings(title.country_codes)
+        self._strings(title.language_codes)
+
+        self._credits(title.cast)
+        self._credits(title.directors)
+        self._credits(title.writers)
+        self._credits(title.producers)
+        self._credits(title.thanks)
+        title.crew = {sys.intern(k): v for k, v in title.crew.items()}
+        for crew_credits in title.crew.values():
+            self._credits(crew_credits)
+        creators = getattr(title, "creators", None)
+        if creators is not None:
+            self._credits(creators)
+
+        for aka in title.akas:
+            if aka.country_code is not None:
+                aka.country_code = sys.intern(aka.country_code)
+            if aka.language_code is not None:
+                aka.language_code = sys.intern(aka.language_code)
+            self._strings(aka.notes)
+
+        episodes = getattr(title, "episodes", None)
+        if episodes is not None:
+            for season in episodes.values():
+                for episode in season.values():
+                    self.title(episode)
+        return title
@@ -22,14 +22,29 @@ The documentation is available on: https://piculet.readthedocs.io/
 from __future__ import annotations
 
 import json
-from collections.abc import Callable, Mapping
-from dataclasses import dataclass, field
+import re
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import dataclass, field, replace
+from enum import Enum
 from functools import partial
-from typing import Any, Literal, TypeAlias
+from time import perf_counter
+from types import NoneType, UnionType
+from typing import (
+    Any,
+    Literal,
+    Self,
+    TypeAlias,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
 
 import lxml.etree
 import lxml.html
 import typedload
+import typedload.datadumper
+import typedload.dataloader
 from jmespath import compile as compile_jmespath
 from lxml.etree import XPath as compile_xpath
 
@@ -37,18 +52,347 @@ from lxml.etree import XPath as compile_xpath
 deserialize = partial(typedload.load, pep563=True, basiccast=False)
 """Generate an object from a dictionary."""
 
-serialize = typedload.dump
-"""Generate a dictionary from an object."""
+
+def _has_deferred(value: Any) -> bool:
+    return callable(getattr(value, "load_deferred", None))
+
+
+def _dump_loaded(
+    dumper: typedload.datadumper.Dumper,
+    value: Any,
+    type_: Any,
+) -> Any:
+    value.load_deferred()
+    for condition, dump in dumper.handlers:
+        if (dump is not _dump_loaded) and condition(value):
+            return dump(dumper, value, type_)  # type: ignore
+    raise TypeError(f"Unsupported type: '{type(value).__name__}'")
+
+
+def serialize(value: Any, **kwargs: Any) -> Any:
+    """Generate a dictionary from an object.
+
+    Objects with deferred attributes are loaded through
+    their ``load_deferred`` method before they are dumped.
+    """
+    dumper = typedload.datadumper.Dumper(**kwargs)  # type: ignore
+    dumper.handlers.insert(0, (_has_deferred, _dump_loaded))
+    return dumper.dump(value)
+
+
+class _Mismatch(Exception):
+    pass
+
+
+def _specialize(
+    loader: typedload.dataloader.Loader,
+    types: Iterable[type],
+) -> None:
+    """Add specialized handlers for dataclasses to a loader.
+
+    A specialized handler converts the fields of the data directly
+    for the common field types, and it falls back to the generic
+    handler of the loader if the data doesn't fit its assumptions.
+    """
+    # converters for the fields of each type, filled in after
+    # all loading functions are created so that they can refer
+    # to each other
+    fields: dict[type, dict[str, Callable[[Any], Any]]] = {}
+    loaders: dict[type, Callable[[Any], Any]] = {}
+
+    def converter(type_: Any) -> Callable[[Any], Any]:
+        if type_ in loader.basictypes:
+            def convert_basic(value: Any) -> Any:
+                if type(value) is not type_:
+                    raise _Mismatch
+                return value
+
+            return convert_basic
+
+        if type_ in loaders:
+            return loaders[type_]
+
+        origin, args = get_origin(type_), get_args(type_)
+        if (origin in {Union, UnionType}) and (len(args) == 2) \
+                and (NoneType in args):
+            some = args[0] if args[1] is NoneType else args[1]
+            convert_some = converter(some)
+            return lambda value: None if value is None else convert_some(value)
+
+        if origin is list:
+            item_type = args[0]
+            if item_type in loader.basictypes:
+                def convert_basic_list(value: Any) -> Any:
+                    if type(value) is not list:
+                        raise _Mismatch
+                    for item in value:
+                        if type(item) is not item_type:
+                            raise _Mismatch
+                    return list(value)
+
+                return convert_basic_list
+
+            convert_item = converter(item_type)
+
+            def convert_list(value: Any) -> Any:
+                if type(value) is not list:
+                    raise _Mismatch
+                return [convert_item(item) for item in value]
+
+            return convert_list
+
+        if (origin is dict) and (args[0] is str):
+            convert_value = converter(args[1])
+
+            def convert_dict(value: Any) -> Any:
+                if type(value) is not dict:
+                    raise _Mismatch
+                for key in value:
+                    if type(key) is not str:
+                        raise _Mismatch
+                return {k: convert_value(v) for k, v in value.items()}
+
+            return convert_dict
+
+        if origin is Literal:
+            def convert_literal(value: Any) -> Any:
+                if value not in args:
+                    raise _Mismatch
+                return value
+
+            return convert_literal
+
+        if isinstance(type_, type) and issubclass(type_, Enum):
+            return type_
+
+        return lambda value: loader.load(value, type_)
+
+    def make_loader(type_: type) -> Callable[[Any], Any]:
+        converters = fields[type_]
+        failonextra = loader.failonextra
+
+        def load(value: Any) -> Any:
+            if type(value) is not dict:
+                raise _Mismatch
+            if failonextra:
+                params = {k: converters[k](v) for k, v in value.items()}
+            else:
+                params = {k: converters[k](v) for k, v in value.items()
+                          if k in converters}
+            return type_(**params)
+
+        return load
+
+    for type_ in types:
+        fields[type_] = {}
+        loaders[type_] = make_loader(type_)
+    for type_, converters in fields.items():
+        hints = get_type_hints(type_)
+        for name in type_.__dataclass_fields__:  # type: ignore
+            converters[name] = converter(hints[name])
+
+    generic_handlers = {type_: loader.handlers[loader.index(type_)][1]
+                        for type_ in loaders}
+
+    def handle(loader_: Any, value: Any, type_: Any) -> Any:
+        try:
+            return loaders[type_](value)
+        except Exception:
+            # let the generic handler deal with it,
+            # and raise the appropriate error if the data is invalid
+            return generic_handlers[type_](loader_, value, type_)
+
+    loader.handlers.insert(0, (lambda type_: type_ in loaders, handle))
+
+
+def make_deserializer(
+    *,
+    specialized: Iterable[type] = (),
+    **options: Any,
+) -> Callable[[Any, Any], Any]:
+    """Make a function that generates objects from dictionaries.
+
+    All calls to the function share one loader, which caches
+    the type information it collects. For the given dataclasses,
+    specialized loading functions will be generated.
+    """
+    loader = typedload.dataloader.Loader(pep563=True, basiccast=False,
+                                         **options)
+    types = list(specialized)
+    if len(types) > 0:
+        _specialize(loader, types)
+    return loader.load
 
 
 Node: TypeAlias = lxml.etree._Element | dict[str, Any]
 
-DocType: TypeAlias = Literal["html", "xml", "json"]
+Document: TypeAlias = str | bytes
+"""A document as text, or as bytes encoded in UTF-8."""
+
+DocType: TypeAlias = Literal["html", "xml", "json", "next_data"]
+
+PathTree: TypeAlias = dict[str, "PathTree | None"]
+"""Tree of the JSON keys to decode, ``None`` meaning the whole subtree."""
+
+
+_json_decoder = json.JSONDecoder()
+
+# decodes values without keeping any of the objects in them
+_skipping_decoder = json.JSONDecoder(object_pairs_hook=lambda pairs: None)
+
+_re_whitespace = re.compile(r"[ \t\n\r]*")
+
+
+def _skip_whitespace(text: str, pos: int) -> int:
+    return _re_whitespace.match(text, pos).end()  # type: ignore
+
+
+def _char(text: str, pos: int) -> str:
+    if pos >= len(text):
+        raise json.JSONDecodeError("Expecting value", text, pos)
+    return text[pos]
+
+
+def _decode_json(
+    text: str,
+    pos: int,
+    paths: PathTree | None,
+) -> tuple[Any, int]:
+    if paths is None:
+        return _json_decoder.raw_decode(text, pos)
+    match _char(text, pos):
+        case "{":
+            obj: dict[str, Any] = {}
+            pos = _skip_whitespace(text, pos + 1)
+            if _char(text, pos) == "}":
+                return obj, pos + 1
+            while True:
+                if _char(text, pos) != '"':
+                    raise json.JSONDecodeError("Invalid JSON", text, pos)
+                key, pos = json.decoder.scanstring(text, pos + 1)  # type: ignore
+                pos = _skip_whitespace(text, pos)
+                if _char(text, pos) != ":":
+                    raise json.JSONDecodeError("Invalid JSON", text, pos)
+                pos = _skip_whitespace(text, pos + 1)
+                if key in paths:
+                    obj[key], pos = _decode_json(text, pos, paths[key])
+                else:
+                    _, pos = _skipping_decoder.raw_decode(text, pos)
+                pos = _skip_whitespace(text, pos)
+                match _char(text, pos):
+                    case ",":
+                        pos = _skip_whitespace(text, pos + 1)
+                    case "}":
+                        return obj, pos + 1
+                    case _:
+                        raise json.JSONDecodeError("Invalid JSON", text, pos)
+        case "[":
+            # lists are transparent: the paths apply to their elements
+            items: list[Any] = []
+            pos = _skip_whitespace(text, pos + 1)
+            if _char(text, pos) == "]":
+                return items, pos + 1
+            while True:
+                item, pos = _decode_json(text, pos, paths)
+                items.append(item)
+                pos = _skip_whitespace(text, pos)
+                match _char(text, pos):
+                    case ",":
+                        pos = _skip_whitespace(text, pos + 1)
+                    case "]":
+                        return items, pos + 1
+                    case _:
+                        raise json.JSONDecodeError("Invalid JSON", text, pos)
+        case _:
+            return _json_decoder.raw_decode(text, pos)
+
+
+def load_json(document: Document, *, paths: PathTree | None = None) -> Any:
+    """Decode a JSON document, optionally only the given paths.
+
+    When decoding with paths, the values of the keys that are not
+    in the paths are scanned but not kept.
+    """
+    if paths is None:
+        return json.loads(document)
+    text = document if isinstance(document, str) else \
+        str(document, encoding="utf-8-sig")
+    data, pos = _decode_json(text, _skip_whitespace(text, 0), paths)
+    if _skip_whitespace(text, pos) != len(text):
+        raise json.JSONDecodeError("Extra data", text, pos)
+    return data
+
+
+def parse_html(document: Document) -> lxml.etree._Element:
+    """Parse an HTML document."""
+    if isinstance(document, str):
+        return lxml.html.fromstring(document)
+    parser = lxml.html.HTMLParser(encoding="utf-8")
+    return lxml.html.fromstring(document, parser=parser)
+
+
+_NEXT_DATA_START = r"""<script[^>]*\sid=["']?__NEXT_DATA__["']?[^>]*>"""
+_SCRIPT_END = r"</script\s*>"
+
+_re_next_data_start = re.compile(_NEXT_DATA_START, re.IGNORECASE)
+_re_script_end = re.compile(_SCRIPT_END, re.IGNORECASE)
+
+_re_next_data_start_bytes = re.compile(
+    _NEXT_DATA_START.encode(),
+    re.IGNORECASE,
+)
+_re_script_end_bytes = re.compile(_SCRIPT_END.encode(), re.IGNORECASE)
+
+
+def _find_next_data(document: Document) -> str | None:
+    if isinstance(document, str):
+        start = _re_next_data_start.search(document)
+        if start is None:
+            return None
+        end = _re_script_end.search(document, start.end())
+        return document[start.end():end.start()] if end is not None else None
+    start_b = _re_next_data_start_bytes.search(document)
+    if start_b is None:
+        return None
+    end_b = _re_script_end_bytes.search(document, start_b.end())
+    if end_b is None:
+        return None
+    # decode only the payload, without copying the rest of the document
+    payload = memoryview(document)[start_b.end():end_b.start()]
+    return str(payload, encoding="utf-8")
+
+
+def parse_next_data(
+    document: Document,
+    *,
+    paths: PathTree | None = None,
+) -> dict[str, Any]:
+    """Get the data embedded by Next.js into an HTML document.
 
-_PARSERS: dict[DocType, Callable[[str], Node]] = {
-    "html": lxml.html.fromstring,
+    The script element containing the data is searched for in the text,
+    and only if that fails, the document is parsed as HTML.
+    """
+    payload = _find_next_data(document)
+    if payload is not None:
+        try:
+            return load_json(payload, paths=paths)
+        except ValueError:
+            pass
+    root = parse_html(document)
+    texts = root.xpath("//script[@id='__NEXT_DATA__']/text()")
+    return load_json("".join(texts), paths=paths)  # type: ignore
+
+
+_PARSERS: dict[DocType, Callable[[Document], Node]] = {
+    "html": parse_html,
     "xml": lxml.etree.fromstring,
     "json": json.loads,
+    "next_data": parse_next_data,
+}
+
+_PROJECTED_PARSERS: dict[DocType, Callable[..., Node]] = {
+    "json": load_json,
+    "next_data": parse_next_data,
 }
 
 
@@ -57,19 +401,92 @@ Postprocessor: TypeAlias = Callable[[dict[str, Any]], dict[str, Any]]
 Transformer: TypeAlias = Callable[[Any], Any]
 
 
+_re_simple_path = re.compile(
+    r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*|\[\*\](?=\.|$))*"
+)
+
+
+def _compile_fields(keys: list[str]) -> Callable[[Any], Any]:
+    if len(keys) == 1:
+        key = keys[0]
+
+        def get_field(value: Any) -> Any:
+            try:
+                return value.get(key)
+            except AttributeError:
+                return None
+
+        return get_field
+
+    def get_fields(value: Any) -> Any:
+        try:
+            for key in keys:
+                value = value.get(key)
+                if value is None:
+                    return None
+        except AttributeError:
+            return None
+        return value
+
+    return get_fields
+
+
+def _compile_projection(
+    base: Callable[[Any], Any],
+    element: Callable[[Any], Any] | None,
+) -> Callable[[Any], Any]:
+    if element is None:
+        def project_elements(value: Any) -> Any:
+            items = base(value)
+            if not isinstance(items, list):
+                return None
+            return [item for item in items if item is not None]
+
+        return project_elements
+
+    def project(value: Any) -> Any:
+        items = base(value)
+        if not isinstance(items, list):
+            return None
+        return [v for v in map(element, items) if v is not None]
+
+    return project
+
+
+def _compile_simple_jmespath(path: str) -> Callable[[Any], Any] | None:
+    """Compile a simple JMESPath expression into a native function.
+
+    Only field chains like ``a.b.c``, and projections over them
+    like ``a[*].b.c``, are supported. For other expressions,
+    the result is ``None``.
+    """
+    if _re_simple_path.fullmatch(path) is None:
+        return None
+    chains = [[key for key in chain.split(".") if len(key) > 0]
+              for chain in path.split("[*]")]
+    evaluate = _compile_fields(chains[-1]) if len(chains[-1]) > 0 else None
+    for keys in reversed(chains[:-1]):
+        evaluate = _compile_projection(_compile_fields(keys), evaluate)
+    return evaluate
+
+
 class Query:
     """A query based on XPath or JMESPath.
 
     Expressions starting with ``/`` or ``./`` are assumed to be XPath,
-    and others are assumed to be JMESPath.
+    and others are assumed to be JMESPath. Simple JMESPath expressions
+    (dotted field chains, optionally with ``[*]`` projections)
+    are evaluated natively instead of through the JMESPath library.
     """
 
     def __init__(self, path: str) -> None:
         self.path: str = path
         """Path expression to apply to nodes."""
 
+        self._is_xpath: bool = path.startswith(("/", "./"))
         self._compiled: Callable[[Node], Any] = \
-            compile_xpath(path) if path.startswith(("/", "./")) else \
+            compile_xpath(path) if self._is_xpath else \
+            _compile_simple_jmespath(path) or \
             compile_jmespath(path).search  # type: ignore
 
     def __str__(self) -> str:
@@ -220,6 +637,8 @@ class Spec(Collector):
 
     _pre: list[Preprocessor] = field(default_factory=list)
     _post: list[Postprocessor] = field(default_factory=list)
+    _extract: Callable[[Node], dict[str, Any]] | None = None
+    _paths: PathTree | None = None
 
     def _set_pre(self, registry: Mapping[str, Preprocessor]) -> None:
         self._pre = [registry[name] for name in self.pre]
@@ -235,6 +654,8 @@ class Spec(Collector):
 
     def extract(self, node: Node):
         """Extract data from a node."""
+        if self._extract is not None:
+            return self._extract(node)
         if self.root is not None:
             node = self.root.get(node)
         data = super().extract(node)
@@ -248,24 +669,432 @@ class Spec(Collector):
 
     def scrape(
         self,
-        document: str | Node,
+        document: Document | Node,
+        *,
+        doctype: DocType,
+        timer: Callable[[str, float], None] | None = None,
+    ) -> dict[str, Any]:
+        """Scrape a document.
+
+        If a timer is given, it's called with the name and the duration
+        of every stage: "build_tree", "preprocess", "extract",
+        and "postprocess".
+        """
+        if timer is not None:
+            return self._scrape_timed(document, doctype=doctype, timer=timer)
+        root = document if not isinstance(document, (str, bytes)) else \
+            build_tree(document, doctype=doctype, paths=self._paths)
+        root = self.preprocess(root)
+        data = self.extract(root)
+        data = self.postprocess(data)
+        return data
+
+    def _scrape_timed(
+        self,
+        document: Document | Node,
         *,
         doctype: DocType,
+        timer: Callable[[str, float], None],
     ) -> dict[str, Any]:
-        """Scrape a document."""
-        root = document if not isinstance(document, str) else \
-            build_tree(document, doctype=doctype)
+        start = perf_counter()
+
+        def lap(stage: str) -> None:
+            nonlocal start
+            end = perf_counter()
+            timer(stage, end - start)
+            start = end
+
+        if isinstance(document, (str, bytes)):
+            root = build_tree(document, doctype=doctype, paths=self._paths)
+            lap("build_tree")
+        else:
+            root = document
         root = self.preprocess(root)
+        lap("preprocess")
         data = self.extract(root)
+        lap("extract")
         data = self.postprocess(data)
+        lap("postprocess")
         return data
 
+    def project(
+        self,
+        keys: Iterable[str],
+        *,
+        computed_keys: bool = False,
+        post: Iterable[str] | None = None,
+    ) -> Self:
+        """Get a copy of this spec that produces only the given keys.
+
+        The rules with computed keys are kept only if ``computed_keys``
+        is set. If ``post`` is given, only the postprocessors
+        with these names are kept. The projected spec is compiled
+        and decodes JSON documents only along the paths of its rules
+        if this spec does.
+        """
+        wanted = frozenset(keys)
+        rules = [
+            rule for rule in self.rules
+            if ((rule.key in wanted) if isinstance(rule.key, str)
+                else computed_keys)
+        ]
+        if post is None:
+            names, postprocessors = self.post, self._post
+        else:
+            kept = frozenset(post)
+            pairs = [(name, postprocess)
+                     for name, postprocess in zip(self.post, self._post)
+                     if name in kept]
+            names = [name for name, _ in pairs]
+            postprocessors = [postprocess for _, postprocess in pairs]
+        spec = replace(self, rules=rules, post=names, _post=postprocessors)
+        if self._extract is not None:
+            spec._extract = compile_spec(spec)
+        if self._paths is not None:
+            spec._paths = spec_paths(spec)
+        return spec
+
+
+def build_tree(
+    document: Document,
+    doctype: DocType,
+    *,
+    paths: PathTree | None = None,
+) -> Node:
+    """Convert a document to a tree.
 
-def build_tree(document: str, doctype: DocType) -> Node:
-    """Convert a document to a tree."""
+    Byte documents are assumed to be encoded in UTF-8,
+    unless an XML document declares otherwise.
+    For JSON documents, only the given paths will be decoded.
+    """
+    if (paths is not None) and (doctype in _PROJECTED_PARSERS):
+        return _PROJECTED_PARSERS[doctype](document, paths=paths)
     return _PARSERS[doctype](document)
 
 
+########################################################################
+# PATHS                                                                #
+########################################################################
+
+
+def _merge_paths(
+    left: PathTree | None,
+    right: PathTree | None,
+) -> PathTree | None:
+    if (left is None) or (right is None):
+        return None
+    merged = dict(left)
+    for key, subtree in right.items():
+        merged[key] = _merge_paths(merged[key], subtree) \
+            if key in merged else subtree
+    return merged
+
+
+def _query_paths(query: Query, result: PathTree | None) -> PathTree | None:
+    """Get the paths a query needs for producing the given result paths."""
+    if query._is_xpath or (_re_simple_path.fullmatch(query.path) is None):
+        return None
+    keys = [key for key in re.split(r"\.|\[\*\]", query.path)
+            if len(key) > 0]
+    paths = result
+    for key in reversed(keys):
+        paths = {key: paths}
+    return paths
+
+
+def _extractor_paths(extractor: Picker | Collector) -> PathTree | None:
+    if isinstance(extractor, Picker):
+        return _query_paths(extractor.path, None)
+    paths: PathTree | None = {}
+    for rule in extractor.rules:
+        paths = _merge_paths(paths, _rule_paths(rule))
+    return paths
+
+
+def _rule_paths(rule: Rule) -> PathTree | None:
+    extractor = rule.extractor
+    paths = _extractor_paths(extractor)
+    if extractor.foreach is not None:
+        paths = _query_paths(extractor.foreach, paths)
+    if not isinstance(rule.key, str):
+        paths = _merge_paths(paths, _query_paths(rule.key.path, None))
+    if rule.foreach is not None:
+        paths = _query_paths(rule.foreach, paths)
+    if extractor.root is not None:
+        paths = _query_paths(extractor.root, paths)
+    return paths
+
+
+def spec_paths(spec: Spec) -> PathTree | None:
+    """Get the JSON paths that the rules of a spec can access.
+
+    Lists are transparent in paths, i.e. the paths under a key
+    apply to the elements if the value of the key is a list.
+    If the rules need the whole document, the result is ``None``.
+    """
+    if len(spec.pre) > 0:
+        return None
+    paths = _extractor_paths(spec)
+    if spec.root is not None:
+        paths = _query_paths(spec.root, paths)
+    return paths
+
+
+########################################################################
+# COMPILATION                                                          #
+########################################################################
+
+# A writer stores the key-value pairs generated by a rule
+# directly into the data of its parent.
+_Writer: TypeAlias = Callable[[Node, dict[str, Any]], None]
+
+_MISSING: Any = object()
+
+_re_shareable_path = re.compile(
+    r"([A-Za-z_][A-Za-z0-9_]*)\.([A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*|\[\*\])*)"  # noqa: E501
+)
+
+
+def _compile_apply(query: Query) -> Callable[[Node], Any]:
+    evaluate = query._compiled
+    if not query._is_xpath:
+        return evaluate
+
+    def apply(node: Node) -> Any:
+        value = evaluate(node)
+        return "".join(value) if len(value) > 0 else None
+
+    return apply
+
+
+def _compile_get(query: Query) -> Callable[[Node], Any]:
+    evaluate = query._compiled
+    if not query._is_xpath:
+        return evaluate
+    return lambda node: evaluate(node)[0]
+
+
+def _compile_select(query: Query) -> Callable[[Node], Any]:
+    evaluate = query._compiled
+    if query._is_xpath:
+        return evaluate
+
+    def select(node: Node) -> Any:
+        value = evaluate(node)
+        return value if value is not None else []
+
+    return select
+
+
+def _compile_transforms(
+    transforms: list[Transformer],
+) -> Transformer | None:
+    match len(transforms):
+        case 0:
+            return None
+        case 1:
+            return transforms[0]
+
+    def transform(value: Any) -> Any:
+        for transform_ in transforms:
+            value = transform_(value)
+        return value
+
+    return transform
+
+
+def _compile_value(extractor: Picker | Collector) -> Callable[[Node], Any]:
+    """Compile an extractor into a function that produces its final value.
+
+    The function returns the ``_MISSING`` marker when there is no value.
+    """
+    extract = _compile_apply(extractor.path) \
+        if isinstance(extractor, Picker) else \
+        _compile_collector(extractor.rules)
+    transform = _compile_transforms(extractor._transforms)
+
+    if extractor.foreach is None:
+        def value_of(node: Node) -> Any:
+            value = extract(node)
+            if value is None:
+                return _MISSING
+            return value if transform is None else transform(value)
+
+        return value_of
+
+    select = _compile_select(extractor.foreach)
+
+    def values_of(node: Node) -> Any:
+        values = [v for v in map(extract, select(node)) if v is not None]
+        if len(values) == 0:
+            return _MISSING
+        return values if transform is None else [transform(v) for v in values]
+
+    return values_of
+
+
+def _compile_rule(rule: Rule) -> _Writer:
+    extractor = rule.extractor
+    get_root = _compile_get(extractor.root) \
+        if extractor.root is not None else None
+    select = _compile_select(rule.foreach) \
+        if rule.foreach is not None else None
+    value_of = _compile_value(extractor)
+
+    if isinstance(rule.key, str):
+        key = rule.key
+
+        if select is None:
+            def write(node: Node, data: dict[str, Any]) -> None:
+                if get_root is not None:
+                    node = get_root(node)
+                value = value_of(node)
+                if value is not _MISSING:
+                    data[key] = value
+
+            return write
+
+        def write_each(root: Node, data: dict[str, Any]) -> None:
+            if get_root is not None:
+                root = get_root(root)
+            for node in select(root):
+                value = value_of(node)
+                if value is not _MISSING:
+                    data[key] = value
+
+        return write_each
+
+    key_path = _compile_apply(rule.key.path)
+    key_transform = _compile_transforms(rule.key._transforms)
+
+    def write_keyed(root: Node, data: dict[str, Any]) -> None:
+        if get_root is not None:
+            root = get_root(root)
+        for node in [root] if select is None else select(root):
+            value = value_of(node)
+            if value is not _MISSING:
+                key = key_path(node)
+                if key_transform is not None:
+                    key = key_transform(key)
+                data[key] = value
+
+    return write_keyed
+
+
+def _split_path(query: Query) -> tuple[str, Query] | None:
+    if query._is_xpath:
+        return None
+    matched = _re_shareable_path.fullmatch(query.path)
+    if matched is None:
+        return None
+    step, rest = matched.groups()
+    return step, Query(rest)
+
+
+def _split_rule(rule: Rule) -> tuple[str, Rule] | None:
+    """Split off the first step of the path a rule applies to its node.
+
+    The result is the name of the step and a rule that produces
+    the same data when applied to the value of that step.
+    Only dotted JMESPath paths (optionally with projections) are split.
+    """
+    extractor = rule.extractor
+    if extractor.root is not None:
+        split = _split_path(extractor.root)
+        if split is None:
+            return None
+        extractor = replace(extractor, root=split[1])
+    elif rule.foreach is not None:
+        split = _split_path(rule.foreach)
+        if split is None:
+            return None
+        return split[0], replace(rule, foreach=split[1])
+    elif not isinstance(rule.key, str):
+        return None
+    elif extractor.foreach is not None:
+        split = _split_path(extractor.foreach)
+        if split is None:
+            return None
+        extractor = replace(extractor, foreach=split[1])
+    elif isinstance(extractor, Picker):
+        split = _split_path(extractor.path)
+        if split is None:
+            return None
+        extractor = replace(extractor, path=split[1])
+    else:
+        return None
+    return split[0], replace(rule, extractor=extractor)
+
+
+def _compile_collector(
+    rules: list[Rule],
+) -> Callable[[Node], dict[str, Any] | None]:
+    """Compile a list of rules into a function that collects their data.
+
+    When the paths of multiple rules start with the same step,
+    that step gets evaluated only once.
+    """
+    splits = [_split_rule(rule) for rule in rules]
+    step_counts: dict[str, int] = {}
+    for split in splits:
+        if split is not None:
+            step_counts[split[0]] = step_counts.get(split[0], 0) + 1
+
+    steps: list[str] = []
+    writers: list[tuple[int, _Writer]] = []
+    for rule, split in zip(rules, splits):
+        if (split is None) or (step_counts[split[0]] < 2):
+            writers.append((0, _compile_rule(rule)))
+            continue
+        step, rest = split
+        if step not in steps:
+            steps.append(step)
+        writers.append((steps.index(step) + 1, _compile_rule(rest)))
+
+    if len(steps) == 0:
+        writes = [write for _, write in writers]
+
+        def collect(node: Node) -> dict[str, Any] | None:
+            data: dict[str, Any] = {}
+            for write in writes:
+                write(node, data)
+            return data if len(data) > 0 else None
+
+        return collect
+
+    evaluate_steps = [Query(step)._compiled for step in steps]
+
+    def collect_shared(node: Node) -> dict[str, Any] | None:
+        data: dict[str, Any] = {}
+        inputs = [node]
+        inputs.extend([evaluate(node) for evaluate in evaluate_steps])
+        for slot, write in writers:
+            write(inputs[slot], data)
+        return data if len(data) > 0 else None
+
+    return collect_shared
+
+
+def compile_spec(spec: Spec) -> Callable[[Node], dict[str, Any]]:
+    """Compile the extraction rules of a spec into a single function.
+
+    The compiled function produces the same data as :meth:`Spec.extract`,
+    but the type of each query is resolved only once,
+    and the values of the common starting steps of sibling paths
+    are shared between rules.
+    """
+    get_root = _compile_get(spec.root) if spec.root is not None else None
+    collect = _compile_collector(spec.rules)
+
+    def extract(node: Node) -> dict[str, Any]:
+        if get_root is not None:
+            node = get_root(node)
+        data = collect(node)
+        return data if data is not None else {}
+
+    return extract
+
+
 def load_spec(
     content: Mapping[str, Any],
     *,
@@ -273,8 +1102,16 @@ def load_spec(
     transformers: Mapping[str, Transformer] | None = None,
     preprocessors: Mapping[str, Preprocessor] | None = None,
     postprocessors: Mapping[str, Postprocessor] | None = None,
+    compiled: bool = False,
+    projected: bool = False,
 ) -> Spec:
-    """Deserialize a mapping into a scraping specification."""
+    """Deserialize a mapping into a scraping specification.
+
+    If ``compiled`` is set, the extraction rules will be compiled
+    after the transformers are resolved. If ``projected`` is set,
+    JSON documents will be decoded only along the paths
+    that the rules can access.
+    """
     spec: Spec = deserialize(
         content,
         type_=type_,
@@ -287,6 +1124,10 @@ def load_spec(
         spec._set_post(postprocessors)
     if transformers is not None:
         spec._set_transforms(transformers)
+    if compiled:
+        spec._extract = compile_spec(spec)
+    if projected:
+        spec._paths = spec_paths(spec)
     return spec
 
 
@@ -28,8 +28,11 @@ from .piculet import Node, Postprocessor, Preprocessor, Query, Transformer
 ########################################################################
 
 
+_next_data_query = Query("//script[@id='__NEXT_DATA__']/text()")
+
+
 def parse_next_data(root: Node) -> Node:
-    next_data = Query("//script[@id='__NEXT_DATA__']/text()").apply(root)
+    next_data = _next_data_query.apply(root)
     return json.loads(next_data)
 
 
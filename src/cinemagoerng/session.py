@@ -0,0 +1,660 @@
+# Copyright 2026 H. Turgut Uyar <uyar@tekir.org>
+#
+# This file is part of CinemagoerNG.
+#
+# CinemagoerNG is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, version 3.
+#
+# CinemagoerNG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with CinemagoerNG.  If not, see <https://www.gnu.org/licenses/>.
+
+from __future__ import annotations
+
+import http.client
+import io
+import random
+import ssl
+import threading
+import time
+import zlib
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, BinaryIO, Protocol, TypeVar
+from urllib.error import HTTPError
+from urllib.parse import urljoin, urlsplit
+
+from . import metrics
+
+
+if TYPE_CHECKING:
+    from .cache import HTTPCache, ResultCache
+
+try:
+    from compression import zstd  # type: ignore
+except ImportError:  # before Python 3.14
+    zstd = None
+
+
+T = TypeVar("T")
+
+
+_REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+MAX_REDIRECTS = 10
+
+CHUNK_SIZE = 64 * 1024
+
+
+ACCEPT_ENCODING = "gzip, deflate" if zstd is None else "zstd, gzip, deflate"
+"""Content encodings that can be decompressed."""
+
+
+class _Decompressor(Protocol):
+    def decompress(self, data: bytes, /) -> bytes: ...
+
+
+class _DeflateDecompressor:
+    """Decompressor for deflate data, with or without the zlib wrapper.
+
+    Some servers send raw deflate data for the "deflate" encoding.
+    """
+
+    def __init__(self) -> None:
+        self._decompressor: Any = None
+        self._head = b""
+
+    def decompress(self, data: bytes, /) -> bytes:
+        if self._decompressor is None:
+            # the zlib header has to be complete to tell the format
+            data = self._head + data
+            if len(data) < 2:
+                self._head = data
+                return b""
+            self._head = b""
+            try:
+                self._decompressor = zlib.decompressobj()
+                return self._decompressor.decompress(data)
+            except zlib.error:
+                self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._decompressor.decompress(data)
+
+    def flush(self) -> bytes:
+        if self._decompressor is None:
+            if len(self._head) == 0:
+                return b""
+            # too short for a header, so it can only be raw deflate data
+            self._decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            return self._decompressor.decompress(self._head) + \
+                self._decompressor.flush()
+        return self._decompressor.flush()
+
+
+class ContentDecoder:
+    """Incremental decoder for the content encoding of a response.
+
+    The encoding is the value of the "Content-Encoding" header.
+    The number of bytes given to the decoder is kept in ``received``.
+    """
+
+    def __init__(self, encoding: str | None) -> None:
+        self.received = 0
+        self._decompressor: _Decompressor | None
+        match (encoding or "").strip().lower():
+            case "" | "identity":
+                self._decompressor = None
+            case "gzip" | "x-gzip":
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            case "deflate":
+                self._decompressor = _DeflateDecompressor()
+            case "zstd" if zstd is not None:
+                self._decompressor = zstd.ZstdDecompressor()
+            case _:
+                raise ValueError(f"Unsupported content encoding: '{encoding}'")
+
+    @property
+    def identity(self) -> bool:
+        return self._decompressor is None
+
+    def decode(self, data: bytes) -> bytes:
+        self.received += len(data)
+        if self._decompressor is None:
+            return data
+        return self._decompressor.decompress(data)
+
+    def flush(self) -> bytes:
+        flush = getattr(self._decompressor, "flush", None)
+        return flush() if flush is not None else b""
+
+
+def read_content(response: BinaryIO, decoder: ContentDecoder) -> bytes:
+    """Read the content of a response, decompressing it while reading."""
+    if decoder.identity:
+        return decoder.decode(response.read())
+    chunks: list[bytes] = []
+    while chunk := response.read(CHUNK_SIZE):
+        chunks.append(decoder.decode(chunk))
+    chunks.append(decoder.flush())
+    return b"".join(chunks)
+
+
+@dataclass(kw_only=True)
+class Response:
+    url: str
+    status: int
+    headers: http.client.HTTPMessage
+    content: bytes
+    received: int = 0
+    """Number of bytes of the content before decompression."""
+
+    def redirect_url(self) -> str | None:
+        """Get the URL to follow if this response is a redirection."""
+        location = self.headers.get("Location")
+        if (self.status not in _REDIRECT_STATUSES) or (location is None):
+            return None
+        return urljoin(self.url, location)
+
+    def error(self, reason: str | None = None) -> HTTPError:
+        if reason is None:
+            reason = http.client.responses.get(self.status, "")
+        return HTTPError(self.url, self.status, reason, self.headers,
+                         io.BytesIO(self.content))
+
+    def raise_for_status(self) -> None:
+        """Raise an HTTP error if the status of this response is an error."""
+        if self.status >= 400:
+            raise self.error()
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Get the number of seconds to wait from a "Retry-After" header.
+
+    The value can be a number of seconds or an HTTP date.
+    """
+    if value is None:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max((moment - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+@dataclass(frozen=True)
+class Rate:
+    """Sustained number of requests per second, and the allowed burst."""
+
+    per_second: float
+    burst: int = 1
+
+
+class TokenBucket:
+    """Token bucket for limiting the rate of requests.
+
+    Taking a token never blocks; it tells how long the caller has to wait
+    before sending its request, so the same bucket can be used
+    by threads and by tasks.
+    """
+
+    def __init__(self, rate: Rate) -> None:
+        self.rate = rate
+        self._tokens = float(rate.burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take a token and get the number of seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._updated
+            self._tokens = min(self._tokens + elapsed * self.rate.per_second,
+                               float(self.rate.burst))
+            self._updated = now
+            self._tokens -= 1.0
+            wait = max(-self._tokens / self.rate.per_second, 0.0)
+            return max(wait, self._paused_until - now)
+
+    def pause(self, seconds: float) -> None:
+        """Delay all requests for a number of seconds."""
+        with self._lock:
+            until = time.monotonic() + seconds
+            self._paused_until = max(self._paused_until, until)
+
+
+DEFAULT_RATES: Mapping[str, Rate] = {
+    "www.imdb.com": Rate(per_second=5.0, burst=10),
+    "caching.graphql.imdb.com": Rate(per_second=10.0, burst=20),
+}
+"""Request rates for the hosts that the pages are fetched from."""
+
+
+class RateLimiter:
+    """Request rate limiter with a separate budget for every host.
+
+    Hosts without a rate are not limited, unless a default rate is given.
+    """
+
+    def __init__(
+        self,
+        rates: Mapping[str, Rate] | None = None,
+        *,
+        default: Rate | None = None,
+    ) -> None:
+        self.rates = dict(rates if rates is not None else DEFAULT_RATES)
+        self.default = default
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host: str) -> TokenBucket | None:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                rate = self.rates.get(host, self.default)
+                if rate is None:
+                    return None
+                bucket = TokenBucket(rate)
+                self._buckets[host] = bucket
+        return bucket
+
+    def reserve(self, host: str) -> float:
+        """Take a token for a host and get the number of seconds to wait."""
+        bucket = self.bucket(host)
+        return bucket.reserve() if bucket is not None else 0.0
+
+    def pause(self, host: str, seconds: float) -> None:
+        """Delay all requests to a host for a number of seconds."""
+        bucket = self.bucket(host)
+        if bucket is not None:
+            bucket.pause(seconds)
+
+
+@dataclass(frozen=True, kw_only=True)
+class Retry:
+    """Policy for retrying requests that failed with a transient error.
+
+    Delays grow exponentially with full jitter, unless the server
+    sends a "Retry-After" header. Requests are not retried
+    if the server asks to wait longer than ``max_retry_after`` seconds.
+    """
+
+    attempts: int = 3
+    backoff: float = 0.5
+    max_backoff: float = 30.0
+    max_retry_after: float = 120.0
+    statuses: frozenset[int] = field(
+        default=frozenset({429, 500, 502, 503, 504}),
+    )
+
+    def allows(self, attempt: int, retry_after: float | None = None) -> bool:
+        """Check whether a request can be retried.
+
+        The attempt is the number of retries so far.
+        """
+        if attempt >= self.attempts:
+            return False
+        return (retry_after is None) or (retry_after <= self.max_retry_after)
+
+    def delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """Get the number of seconds to wait before retrying.
+
+        The attempt is the number of retries so far.
+        """
+        if retry_after is not None:
+            return min(retry_after, self.max_retry_after)
+        limit = min(self.backoff * (2 ** attempt), self.max_backoff)
+        return random.uniform(0.0, limit)
+
+
+def retry_delay(
+    retry: Retry,
+    limiter: RateLimiter,
+    *,
+    host: str,
+    attempt: int,
+    response: Response | None,
+) -> float | None:
+    """Get the delay before retrying a request, or None to give up.
+
+    A "Retry-After" delay pauses all requests to the host.
+    """
+    if not retry.allows(attempt):
+        return None
+    if response is None:
+        return retry.delay(attempt)
+    if response.status not in retry.statuses:
+        return None
+    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+    if not retry.allows(attempt, retry_after):
+        return None
+    if retry_after is not None:
+        limiter.pause(host, retry_after)
+    return retry.delay(attempt, retry_after)
+
+
+def count_response(host: str, received: int) -> None:
+    """Count a received response in the metrics of its host.
+
+    The size is the number of bytes before decompression.
+    """
+    metrics.REQUESTS.inc(host=host)
+    metrics.RESPONSE_BYTES.inc(received, host=host)
+
+
+class _Call:
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Group of calls where concurrent calls with the same key run once.
+
+    The callers that arrive while a call is running wait for it,
+    and get its result or its error.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: str, func: Callable[[], T]) -> tuple[T, bool]:
+        """Call a function once for all concurrent callers with a key.
+
+        The second item of the result tells whether the result
+        is shared with other callers.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+            else:
+                call.waiters += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                shared = call.waiters > 0
+            call.done.set()
+        return call.result, shared
+
+
+class _HTTPSConnection(http.client.HTTPSConnection):
+    """HTTPS connection that resumes the last TLS session of its pool."""
+
+    def __init__(
+        self,
+        host: str,
+        port: int | None,
+        *,
+        timeout: float | None,
+        context: ssl.SSLContext,
+        pool: _Pool,
+    ) -> None:
+        super().__init__(host, port, timeout=timeout, context=context)
+        self._tls_context = context
+        self._pool = pool
+
+    def connect(self) -> None:
+        http.client.HTTPConnection.connect(self)
+        self.sock = self._tls_context.wrap_socket(
+            self.sock,
+            server_hostname=self.host,
+            session=self._pool.tls_session,
+        )
+
+
+class _Pool:
+    """Idle connections to one host."""
+
+    def __init__(
+        self,
+        scheme: str,
+        host: str,
+        *,
+        size: int,
+        timeout: float | None,
+        context: ssl.SSLContext,
+    ) -> None:
+        self.scheme = scheme
+        self.host = host
+        self.size = size
+        self.timeout = timeout
+        self.context = context
+        self.tls_session: ssl.SSLSession | None = None
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        if self.scheme == "https":
+            return _HTTPSConnection(self.host, None, timeout=self.timeout,
+                                    context=self.context, pool=self)
+        return http.client.HTTPConnection(self.host, timeout=self.timeout)
+
+    def acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        """Get an idle connection, or a new one if there is none.
+
+        The second item of the result tells whether the connection
+        has been used before.
+        """
+        with self._lock:
+            if len(self._idle) > 0:
+                return self._idle.pop(), True
+        return self._connect(), False
+
+    def release(self, conn: http.client.HTTPConnection) -> None:
+        """Return a connection to the pool, or close it if it's full."""
+        if conn.sock is None:
+            return
+        if isinstance(conn.sock, ssl.SSLSocket):
+            # session tickets might arrive after the handshake,
+            # so the session is updated after a response is read
+            self.tls_session = conn.sock.session
+        with self._lock:
+            if len(self._idle) < self.size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class Session:
+    """HTTP client that keeps connections alive between requests.
+
+    Connections are pooled per host and at most ``pool_size`` idle
+    connections are kept for each host. New TLS connections
+    resume the last TLS session of their host to save a full handshake.
+    Requests are sent within the rates of the limiter, and the ones
+    that fail with a transient error are retried according to
+    the retry policy. The data scraped from the responses is cached
+    in the result cache, if there is one. Concurrent requests
+    for the same page are sent once and their data is scraped once.
+    A session can be shared between threads.
+    """
+
+    def __init__(
+        self,
+        *,
+        pool_size: int = 4,
+        timeout: float | None = 30.0,
+        ssl_context: ssl.SSLContext | None = None,
+        limiter: RateLimiter | None = None,
+        retry: Retry | None = None,
+        cache: HTTPCache | None = None,
+        result_cache: ResultCache | None = None,
+    ) -> None:
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.ssl_context = ssl_context if ssl_context is not None else \
+            ssl.create_default_context()
+        self.limiter = limiter if limiter is not None else RateLimiter()
+        self.retry = retry if retry is not None else Retry()
+        self.cache = cache
+        self.result_cache = result_cache
+        self.flights = SingleFlight()
+        self._pools: dict[tuple[str, str], _Pool] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> Session:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def _pool(self, scheme: str, host: str) -> _Pool:
+        key = (scheme, host)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = _Pool(scheme, host, size=self.pool_size,
+                             timeout=self.timeout, context=self.ssl_context)
+                self._pools[key] = pool
+        return pool
+
+    def _send(self, url: str, headers: dict[str, str]) -> Response:
+        parts = urlsplit(url)
+        if parts.scheme not in {"http", "https"}:
+            raise ValueError(f"Unsupported URL scheme: '{parts.scheme}'")
+        target = parts.path if len(parts.path) > 0 else "/"
+        if len(parts.query) > 0:
+            target += "?" + parts.query
+        pool = self._pool(parts.scheme, parts.netloc)
+        while True:
+            conn, reused = pool.acquire()
+            try:
+                conn.request("GET", target, headers=headers)
+                response = conn.getresponse()
+                decoder = ContentDecoder(
+                    response.headers.get("Content-Encoding"),
+                )
+                content = read_content(response, decoder)  # type: ignore
+            except (ConnectionError, http.client.HTTPException):
+                conn.close()
+                if reused:  # the server might have closed an idle connection
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                pool.release(conn)
+            return Response(url=url, status=response.status,
+                            headers=response.headers, content=content,
+                            received=decoder.received)
+
+    def _send_with_retry(
+        self,
+        url: str,
+        headers: dict[str, str],
+        retry: Retry,
+    ) -> Response:
+        host = urlsplit(url).hostname or ""
+        attempt = 0
+        while True:
+            time.sleep(self.limiter.reserve(host))
+            try:
+                response = self._send(url, headers)
+                count_response(host, response.received)
+            except (ConnectionError, TimeoutError):
+                delay = retry_delay(retry, self.limiter, host=host,
+                                     attempt=attempt, response=None)
+                if delay is None:
+                    raise
+            else:
+                delay = retry_delay(retry, self.limiter, host=host,
+                                     attempt=attempt, response=response)
+                if delay is None:
+                    return response
+            metrics.RETRIES.inc(host=host)
+            time.sleep(delay)
+            attempt += 1
+
+    def _follow(
+        self,
+        url: str,
+        headers: dict[str, str],
+        retry: Retry,
+    ) -> Response:
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send_with_retry(url, headers, retry)
+            redirect_url = response.redirect_url()
+            if redirect_url is None:
+                response.raise_for_status()
+                return response
+            url = redirect_url
+        raise response.error("Too many redirections")
+
+    def get(
+        self,
+        url: str,
+        *,
+        headers: dict[str, str] | None = None,
+        ttl: float | None = None,
+        retry: Retry | None = None,
+    ) -> Response:
+        """Get the response for a URL, following redirections.
+
+        Compressed contents are decompressed according to the
+        "Content-Encoding" header. Error statuses raise
+        :class:`urllib.error.HTTPError`, like the responses
+        of :func:`urllib.request.urlopen`. If the session has a cache,
+        fresh responses are taken from it, and successful responses
+        are stored in it for ``ttl`` seconds. The given retry policy
+        is used instead of the one of the session.
+        """
+        request_headers = headers if headers is not None else {}
+        policy = retry if retry is not None else self.retry
+        if self.cache is None:
+            return self._follow(url, request_headers, policy)
+        key, entry = self.cache.lookup(url, request_headers)
+        if entry is not None:
+            if entry.fresh():
+                metrics.CACHE_LOOKUPS.inc(cache="http", result="hit")
+                return entry.response()
+            request_headers = request_headers | entry.validators()
+        response = self._follow(url, request_headers, policy)
+        return self.cache.update(key, entry, response, ttl=ttl)
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
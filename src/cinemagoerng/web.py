@@ -14,40 +14,111 @@
 # You should have received a copy of the GNU General Public License
 # along with CinemagoerNG.  If not, see <https://www.gnu.org/licenses/>.
 
+import codecs
+import copy
 import json
-from collections.abc import Mapping
-from dataclasses import dataclass
+import threading
+import time
+import urllib.request
+from collections.abc import Callable, Generator, Iterable, Iterator, Mapping
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass, replace
 from decimal import Decimal
 from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, NotRequired, TypedDict
-from urllib.request import Request, urlopen
+from typing import (
+    Any,
+    NotRequired,
+    TypeAlias,
+    TypedDict,
+    TypeVar,
+    cast,
+    get_type_hints,
+)
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlsplit
 
-from . import model, piculet, registry
+from . import hooks, metrics, model, piculet, registry
+from .cache import ResultCache, cache_key
+from .session import (
+    ACCEPT_ENCODING,
+    ContentDecoder,
+    Retry,
+    Session,
+    SingleFlight,
+    count_response,
+    parse_retry_after,
+    read_content,
+)
 
 
 _USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64; rv:102.0) Firefox/102.0"
 
 
-def fetch(url: str, /, *, headers: dict[str, str] | None = None) -> str:
-    request = Request(url)
+def as_utf8(content: bytes, charset: str | None) -> bytes:
+    """Re-encode content in the given charset as UTF-8."""
+    if charset is None:
+        return content
+    try:
+        if codecs.lookup(charset).name == "utf-8":
+            return content
+    except LookupError:
+        return content
+    return content.decode(charset).encode("utf-8")
+
+
+def fetch_headers(headers: dict[str, str] | None) -> dict[str, str]:
+    """Add the default headers for fetching to the given headers."""
     request_headers = headers if headers is not None else {}
     if "User-Agent" not in request_headers:
         request_headers["User-Agent"] = _USER_AGENT
+    if "Accept-Encoding" not in request_headers:
+        request_headers["Accept-Encoding"] = ACCEPT_ENCODING
+    return request_headers
+
+
+def fetch(
+    url: str,
+    /,
+    *,
+    headers: dict[str, str] | None = None,
+    session: Session | None = None,
+    ttl: float | None = None,
+    retry: Retry | None = None,
+) -> bytes:
+    request_headers = fetch_headers(headers)
+    if session is not None:
+        response = session.get(url, headers=request_headers, ttl=ttl,
+                               retry=retry)
+        content = response.content
+        charset = response.headers.get_content_charset()
+        return as_utf8(content, charset)
+    request = urllib.request.Request(url)
     for header, value in request_headers.items():
         request.add_header(header, value)
-    with urlopen(request) as response:
-        content: bytes = response.read()
-    return content.decode("utf-8")
+    with urllib.request.urlopen(request) as response:
+        decoder = ContentDecoder(response.headers.get("Content-Encoding"))
+        content = read_content(response, decoder)
+        charset = response.headers.get_content_charset()
+    count_response(urlsplit(url).hostname or "", decoder.received)
+    return as_utf8(content, charset)
 
 
 class GraphQLVariables(TypedDict):
     after: NotRequired[str]
     const: NotRequired[str]
+    filter: NotRequired[dict[str, Any]]
     first: NotRequired[int]
     isAutoTranslationEnabled: NotRequired[bool]
     locale: NotRequired[str]
     originalTitleText: NotRequired[bool]
+    returnUrl: NotRequired[str]
+    sort: NotRequired[dict[str, str]]
 
 
 class GraphQLParams(TypedDict):
@@ -56,18 +127,52 @@ class GraphQLParams(TypedDict):
     extensions: dict[str, Any]
 
 
-deserialize: partial[Any] = partial(
-    piculet.deserialize,
+deserialize = piculet.make_deserializer(
     strconstructed={Decimal},
     failonextra=True,
+    specialized=[
+        model.Title,
+        model.Person,
+        model.CastCredit,
+        model.CrewCredit,
+        model.AKA,
+        model.Certificate,
+        model.Certification,
+        model.AdvisoryVotes,
+        model.AdvisoryDetail,
+        model.Advisory,
+        model.Advisories,
+    ],
 )
 
 
+@dataclass(kw_only=True)
+class Pagination:
+    """Cursor-based pagination of a GraphQL query.
+
+    The keys are the names of the items, the next page flag
+    and the end cursor in the scraped data of a page.
+    The page size is adapted between ``min_size`` and ``max_size``,
+    starting from the value of the size variable in the spec.
+    """
+
+    items: str
+    has_next_page: str = "has_next_page"
+    end_cursor: str = "end_cursor"
+    cursor_variable: str = "after"
+    size_variable: str = "first"
+    min_size: int = 10
+    max_size: int | None = None
+
+
 @dataclass(kw_only=True)
 class Spec(piculet.Spec):
     version: str
+    name: str = ""
     url: str
     graphql: GraphQLParams | None = None
+    pagination: Pagination | None = None
+    cache_ttl: int | None = None
     doctype: piculet.DocType
 
 
@@ -79,11 +184,13 @@ def _spec(page: str, /) -> Spec:
     path = SPECS_DIR / f"{page}.json"
     content = path.read_text(encoding="utf-8")
     return piculet.load_spec(
-        json.loads(content),
+        {"name": page} | json.loads(content),
         type_=Spec,
         preprocessors=registry.preprocessors,
         postprocessors=registry.postprocessors,
         transformers=registry.transformers,
+        compiled=True,
+        projected=True,
     )  # type: ignore
 
 
@@ -102,93 +209,899 @@ def _get_url(spec: Spec, context: Mapping[str, Any]) -> str:
     return url_template % context
 
 
-def _scrape(
+def _size(document: piculet.Document) -> int:
+    return len(document.encode("utf-8") if isinstance(document, str)
+               else document)
+
+
+def _observe(
+    stage: hooks.Stage,
+    spec: Spec,
+    duration: float,
+    *,
+    size: int | None = None,
+    url: str | None = None,
+) -> None:
+    hooks.notify(hooks.StageEvent(stage=stage, spec=spec.name,
+                                  started=time.time() - duration,
+                                  duration=duration, size=size, url=url))
+
+
+@dataclass(frozen=True)
+class Parsed:
+    """Data that has already been scraped for a request.
+
+    Transports can reply to requests with scraped data
+    instead of a document, for example from a cache.
+    """
+
+    data: dict[str, Any]
+
+
+Reply: TypeAlias = piculet.Document | Parsed
+
+
+@dataclass(frozen=True, kw_only=True)
+class Request:
+    """Description of an HTTP GET request for scraping a page.
+
+    Any transport can get the response for a request.
+    The User-Agent and Accept-Encoding headers are left
+    to the transport. The request should be sent
+    after the delay, in seconds. If a retry policy is given,
+    the transport uses it instead of its own.
+    """
+
+    url: str
+    headers: dict[str, str]
+    spec: Spec
+    delay: float = 0.0
+    retry: Retry | None = None
+
+    def parse(self, document: Reply) -> dict[str, Any]:
+        """Scrape the content of the response to this request.
+
+        Byte contents must be encoded in UTF-8. Already scraped data
+        is used as is.
+        """
+        if isinstance(document, Parsed):
+            return document.data
+        start = time.perf_counter()
+        if not hooks.observers:
+            data = self.spec.scrape(document, doctype=self.spec.doctype)
+        else:
+            size = _size(document)
+
+            def timer(stage: str, duration: float) -> None:
+                _observe(cast(hooks.Stage, stage), self.spec, duration,
+                         size=size if stage == "build_tree" else None,
+                         url=self.url)
+
+            data = self.spec.scrape(document, doctype=self.spec.doctype,
+                                    timer=timer)
+        metrics.PARSE_SECONDS.observe(time.perf_counter() - start,
+                                      spec=self.spec.name)
+        return data
+
+
+def make_request(
     spec: Spec,
     *,
     context: Mapping[str, Any],
     headers: dict[str, str] | None = None,
-) -> dict[str, Any]:
-    url = _get_url(spec, context=context)
-    request_headers = headers if headers is not None else {}
+) -> Request:
+    request_headers = dict(headers) if headers is not None else {}
     if spec.graphql is not None:
         request_headers["Content-Type"] = "application/json"
-    document = fetch(url, headers=request_headers)
-    return spec.scrape(document, doctype=spec.doctype)
+    url = _get_url(spec, context=context)
+    return Request(url=url, headers=request_headers, spec=spec)
+
+
+T = TypeVar("T")
+
+Flow: TypeAlias = Generator[Request, Reply, T]
+"""Generator that yields requests and receives the replies to them.
+
+The return value of the generator is the result of the flow.
+"""
+
+Transport: TypeAlias = Callable[[Request], Reply]
+
+
+def run(flow: Flow[T], transport: Transport) -> T:
+    """Run a flow, getting the responses to its requests from a transport.
+
+    Errors raised by the transport are thrown into the flow.
+    """
+    try:
+        request = next(flow)
+        while True:
+            if request.delay > 0:
+                time.sleep(request.delay)
+            try:
+                document = transport(request)
+            except Exception as e:
+                request = flow.throw(e)
+            else:
+                request = flow.send(document)
+    except StopIteration as stop:
+        return stop.value
+
+
+def observe_fetch(
+    request: Request,
+    document: piculet.Document,
+    duration: float,
+) -> None:
+    """Notify the observers that the document for a request was fetched."""
+    _observe("network", request.spec, duration, size=_size(document),
+             url=request.url)
+
+
+def _fetch_request(
+    request: Request,
+    *,
+    session: Session | None = None,
+) -> piculet.Document:
+    if not hooks.observers:
+        return fetch(request.url, headers=dict(request.headers),
+                     session=session, ttl=request.spec.cache_ttl,
+                     retry=request.retry)
+    start = time.perf_counter()
+    document = fetch(request.url, headers=dict(request.headers),
+                     session=session, ttl=request.spec.cache_ttl,
+                     retry=request.retry)
+    observe_fetch(request, document, time.perf_counter() - start)
+    return document
+
+
+def _rule_name(rule: piculet.Rule) -> str:
+    if isinstance(rule.key, str):
+        return rule.key
+    # computed keys are named by their queries and transforms,
+    # since their representations contain memory addresses
+    key = rule.key
+    queries = [query.path for query in (key.root, key.path)
+               if query is not None]
+    return "|".join(queries + key.transforms)
+
+
+def result_key(request: Request) -> str:
+    """Get the key of the data scraped for a request.
+
+    The key changes when the version of the spec changes,
+    or when the spec is projected to other fields.
+    It's the same in all processes.
+    """
+    spec = request.spec
+    fields = ",".join(sorted(_rule_name(rule) for rule in spec.rules))
+    return "\n".join([spec.version, fields,
+                      cache_key(request.url, request.headers)])
+
+
+def _cached_transport(transport: Transport, cache: ResultCache) -> Transport:
+    def refresh(request: Request, key: str) -> None:
+        try:
+            data = request.parse(transport(request))
+            cache.set(key, data, ttl=request.spec.cache_ttl)
+        except Exception:  # the stale data is kept
+            pass
+        finally:
+            cache.release_refresh(key)
+
+    def get(request: Request) -> Reply:
+        key = result_key(request)
+        data, stale = cache.get(key)
+        if data is None:
+            data = request.parse(transport(request))
+            cache.set(key, data, ttl=request.spec.cache_ttl)
+        elif stale and cache.claim_refresh(key):
+            threading.Thread(target=refresh, args=(request, key),
+                             daemon=True).start()
+        return Parsed(data)
+
+    return get
+
+
+def coalesced_reply(data: dict[str, Any], shared: bool) -> Parsed:
+    """Reply with data that might be shared by coalesced requests."""
+    # flows modify the data, so every caller gets its own copy
+    return Parsed(copy.deepcopy(data) if shared else data)
+
+
+def _coalesced_transport(
+    transport: Transport,
+    flights: SingleFlight,
+) -> Transport:
+    def get(request: Request) -> Reply:
+        data, shared = flights.do(
+            result_key(request),
+            lambda: request.parse(transport(request)),
+        )
+        return coalesced_reply(data, shared)
+
+    return get
+
+
+# group for coalescing the requests that are not made through a session
+_FLIGHTS = SingleFlight()
+
+
+def _transport(session: Session | None) -> Transport:
+    flights = session.flights if session is not None else _FLIGHTS
+    transport = _coalesced_transport(
+        partial(_fetch_request, session=session),
+        flights,
+    )
+    if (session is None) or (session.result_cache is None):
+        return transport
+    return _cached_transport(transport, session.result_cache)
+
+
+_LAZY_TYPES: dict[str, Any] = {
+    attr: hint
+    for attr, hint in get_type_hints(model.Title).items()
+    if attr in model.LAZY_ATTRS
+}
+
+
+_TITLE_ATTRS = frozenset(model.Title.__dataclass_fields__)
+
+_TITLE_REQUIRED_ATTRS = frozenset({"imdb_id", "title", "type_id"})
+
+# the credit attributes are collected through computed keys
+# and need all the postprocessors
+_TITLE_CREDIT_ATTRS = frozenset({
+    "cast",
+    "crew",
+    "directors",
+    "writers",
+    "producers",
+    "thanks",
+})
+
+
+@lru_cache(maxsize=64)
+def _title_spec(attrs: frozenset[str], /) -> Spec:
+    unknown = attrs - _TITLE_ATTRS
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown title fields: {', '.join(sorted(unknown))}")
+    spec = _spec("title_reference")
+    if attrs.isdisjoint(_TITLE_CREDIT_ATTRS):
+        return spec.project(attrs, post=[])
+    return spec.project(attrs, computed_keys=True)
+
+
+def _title_query(
+    fields: Iterable[str] | None,
+) -> tuple[Spec, frozenset[str] | None]:
+    if fields is None:
+        return _spec("title_reference"), None
+    attrs = _TITLE_REQUIRED_ATTRS.union(fields)
+    return _title_spec(attrs), attrs
+
+
+def _deserialize(data: Any, type_: Any, *, spec: Spec) -> Any:
+    start = time.perf_counter()
+    obj = deserialize(data, type_)
+    duration = time.perf_counter() - start
+    metrics.DESERIALIZE_SECONDS.observe(duration, spec=spec.name)
+    if hooks.observers:
+        _observe("deserialize", spec, duration)
+    return obj
+
+
+def _make_title(
+    data: dict[str, Any],
+    *,
+    spec: Spec,
+    attrs: frozenset[str] | None,
+    lazy: bool,
+) -> model.Title:
+    if attrs is not None:
+        data = {key: value for key, value in data.items() if key in attrs}
+    if not lazy:
+        return _deserialize(data, model.Title, spec=spec)
+    sections = {attr: data.pop(attr) for attr in _LAZY_TYPES if attr in data}
+    title: model.Title = _deserialize(data, model.Title, spec=spec)
+    for attr, value in sections.items():
+        load = partial(deserialize, value, _LAZY_TYPES[attr])
+        model.defer(title, attr, load)
+    return title
+
+
+def title_flow(
+    imdb_id: str,
+    *,
+    fields: Iterable[str] | None = None,
+    lazy: bool = False,
+    headers: dict[str, str] | None = None,
+) -> Flow[model.Title]:
+    spec, attrs = _title_query(fields)
+    context = {"imdb_id": imdb_id}
+    request = make_request(spec, context=context, headers=headers)
+    data = request.parse((yield request))
+    return _make_title(data, spec=spec, attrs=attrs, lazy=lazy)
 
 
 def get_title(
     imdb_id: str,
     *,
+    fields: Iterable[str] | None = None,
+    lazy: bool = False,
+    include: Iterable[str] = (),
     headers: dict[str, str] | None = None,
+    session: Session | None = None,
 ) -> model.Title:
-    spec = _spec("title_reference")
-    context = {"imdb_id": imdb_id}
-    data = _scrape(spec=spec, context=context, headers=headers)
-    return deserialize(data, model.Title)
+    """Get a title from its reference page.
 
+    The names in ``include`` select the extra data to set on the title:
+    ``"taglines"``, ``"akas"`` and ``"parental_guide"``. Their pages
+    are fetched concurrently with the reference page.
+    """
+    updates = check_updates(include)
+    flow = title_flow(imdb_id, fields=fields, lazy=lazy, headers=headers)
+    transport = _transport(session)
+    if len(updates) == 0:
+        return run(flow, transport)
+    placeholder, flows = update_flows(imdb_id, updates, headers)
+    with ThreadPoolExecutor(max_workers=len(flows)) as executor:
+        futures = [executor.submit(run, update_flow, transport)
+                   for update_flow in flows]
+        title = run(flow, transport)
+        for future in futures:
+            future.result()
+    apply_updates(title, placeholder, updates)
+    return title
 
-def set_taglines(
+
+def taglines_flow(
     title: model.Title,
     *,
     headers: dict[str, str] | None = None,
-) -> None:
+) -> Flow[None]:
     spec = _spec("title_taglines")
     context = {"imdb_id": title.imdb_id}
-    data = _scrape(spec=spec, context=context, headers=headers)
+    request = make_request(spec, context=context, headers=headers)
+    data = request.parse((yield request))
     taglines = data.get("taglines")
     if taglines is not None:
         title.taglines = data["taglines"]
 
 
+def set_taglines(
+    title: model.Title,
+    *,
+    headers: dict[str, str] | None = None,
+    session: Session | None = None,
+) -> None:
+    run(taglines_flow(title, headers=headers), _transport(session))
+
+
+class PaginationError(Exception):
+    """Error while getting a page of a paginated collection.
+
+    The cursor of the page can be used to resume the pagination.
+    """
+
+    def __init__(self, message: str, *, cursor: str | None) -> None:
+        super().__init__(message)
+        self.cursor = cursor
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, HTTPError):
+        return (error.code == 429) or (error.code >= 500)
+    return isinstance(error, OSError)
+
+
+def _is_overloaded(error: Exception) -> bool:
+    # server errors and timeouts might be caused by too large pages
+    if isinstance(error, HTTPError):
+        return error.code >= 500
+    if isinstance(error, URLError):
+        return isinstance(error.reason, TimeoutError)
+    return isinstance(error, TimeoutError)
+
+
+def _retry_after(error: Exception) -> float | None:
+    if (not isinstance(error, HTTPError)) or (error.headers is None):
+        return None
+    return parse_retry_after(error.headers.get("Retry-After"))
+
+
+# the paginator retries failed pages, so the transports must not
+_NO_RETRY = Retry(attempts=0)
+
+
+class Paginator:
+    """Sans-IO state of a cursor-based pagination.
+
+    Every paginator keeps its own copy of the GraphQL variables,
+    so the spec is not modified and paginators can run concurrently.
+    The given variables override the ones in the spec.
+    Pagination starts from the given cursor, if any.
+    Failed pages are retried according to the retry policy,
+    and the transports are told not to retry them by themselves.
+    """
+
+    def __init__(
+        self,
+        spec: Spec,
+        *,
+        context: Mapping[str, Any],
+        variables: Mapping[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        cursor: str | None = None,
+        retry: Retry | None = None,
+    ) -> None:
+        if (spec.graphql is None) or (spec.pagination is None):
+            raise ValueError("Spec is not paginated")
+        self.spec = spec
+        self.pagination = spec.pagination
+        self.context = context
+        self.headers = headers
+        self.variables: dict[str, Any] = dict(spec.graphql["variables"])
+        if variables is not None:
+            self.variables.update(variables)
+        self.cursor = cursor
+        self.page_size: int = self.variables[self.pagination.size_variable]
+        self.max_size = self.pagination.max_size \
+            if self.pagination.max_size is not None else self.page_size
+        self.retry = retry if retry is not None else Retry()
+        self.failures = 0
+        self.delay = 0.0
+        self.done = False
+
+    def next_request(self) -> Request:
+        """Get the request for the page after the current cursor."""
+        pagination = self.pagination
+        variables = self.variables | {pagination.size_variable: self.page_size}
+        if self.cursor is not None:
+            variables[pagination.cursor_variable] = self.cursor
+        assert self.spec.graphql is not None, self.spec
+        g_params = self.spec.graphql | {
+            "variables": cast(GraphQLVariables, variables),
+        }
+        page_spec = replace(self.spec, graphql=g_params)
+        context = dict(self.context) | variables
+        request = make_request(page_spec, context=context,
+                               headers=self.headers)
+        return replace(request, delay=self.delay, retry=_NO_RETRY)
+
+    def receive(
+        self,
+        request: Request,
+        document: Reply,
+    ) -> list[Any]:
+        """Scrape a page and move the cursor to its end.
+
+        The page size grows back after every successful page.
+        A reply without page data, such as a GraphQL error,
+        raises a pagination error with the cursor to resume from.
+        """
+        pagination = self.pagination
+        data = request.parse(document)
+        if pagination.has_next_page not in data:
+            raise PaginationError("Reply has no page data",
+                                  cursor=self.cursor)
+        end_cursor = data.get(pagination.end_cursor)
+        if (not data.get(pagination.has_next_page, False)) or \
+                (end_cursor is None):
+            self.done = True
+        self.cursor = end_cursor
+        self.page_size = min(self.page_size * 2, self.max_size)
+        self.failures = 0
+        self.delay = 0.0
+        items: list[Any] = data.get(pagination.items, [])
+        return items
+
+    def fail(self, error: Exception) -> None:
+        """Handle an error while getting the page after the current cursor.
+
+        If the error is transient, the page gets retried after a delay,
+        until the retries run out. After server errors and timeouts,
+        the page size also gets smaller, until it reaches its minimum.
+        Otherwise, the error is raised as a pagination error
+        with the cursor to resume from.
+        """
+        retry_after = _retry_after(error)
+        if (not _is_transient(error)) or \
+                (not self.retry.allows(self.failures, retry_after)):
+            raise PaginationError(str(error), cursor=self.cursor) from error
+        if _is_overloaded(error):
+            self.page_size = max(self.page_size // 2, self.pagination.min_size)
+        self.delay = self.retry.delay(self.failures, retry_after)
+        self.failures += 1
+
+
+def paginated_flow(paginator: Paginator) -> Generator[
+    Request,
+    Reply,
+    list[Any] | None,
+]:
+    """Flow for getting the next page of items.
+
+    The page is retried after transient errors.
+    The result is ``None`` if there are no more pages.
+    """
+    while not paginator.done:
+        request = paginator.next_request()
+        try:
+            document = yield request
+        except Exception as e:
+            paginator.fail(e)
+            continue
+        return paginator.receive(request, document)
+    return None
+
+
+def akas_flow(
+    title: model.Title,
+    *,
+    spec: Spec | None = None,
+    cursor: str | None = None,
+    headers: dict[str, str] | None = None,
+) -> Flow[None]:
+    paginator = akas_paginator(title, spec=spec, cursor=cursor,
+                                headers=headers)
+    while (items := (yield from paginated_flow(paginator))) is not None:
+        title.akas.extend(akas_page(paginator, items))
+
+
+def _iter_pages(
+    paginator: Paginator,
+    transport: Transport,
+) -> Iterator[list[Any]]:
+    while (items := run(paginated_flow(paginator), transport)) is not None:
+        yield items
+
+
+def akas_paginator(
+    title: model.Title,
+    *,
+    spec: Spec | None = None,
+    cursor: str | None = None,
+    headers: dict[str, str] | None = None,
+) -> Paginator:
+    """Get the paginator for the AKAs of a title."""
+    return Paginator(
+        spec if spec is not None else _spec("title_akas"),
+        context={"imdb_id": title.imdb_id},
+        headers=headers,
+        cursor=cursor,
+    )
+
+
+def akas_page(paginator: Paginator, items: list[Any]) -> list[model.AKA]:
+    """Get the AKAs on a page."""
+    return _deserialize(items, list[model.AKA], spec=paginator.spec)
+
+
+def iter_akas(
+    title: model.Title,
+    *,
+    cursor: str | None = None,
+    headers: dict[str, str] | None = None,
+    session: Session | None = None,
+) -> Iterator[model.AKA]:
+    """Generate the AKAs of a title, getting one page at a time.
+
+    The next page is requested only when the AKAs of the previous page
+    are consumed, and the title is not modified.
+    """
+    paginator = akas_paginator(title, spec=None, cursor=cursor,
+                                headers=headers)
+    for items in _iter_pages(paginator, _transport(session)):
+        yield from akas_page(paginator, items)
+
+
 def set_akas(
     title: model.Title,
     *,
     spec: Spec | None = None,
+    cursor: str | None = None,
     headers: dict[str, str] | None = None,
+    session: Session | None = None,
 ) -> None:
-    if spec is None:
-        spec = _spec("title_akas")
-    g_params = spec.graphql
-    assert g_params is not None, g_params
-    g_vars = g_params["variables"]
-    context: dict[str, Any] = {"imdb_id": title.imdb_id} | g_vars
-    data = _scrape(spec, context=context, headers=headers)
-    akas = [deserialize(aka, model.AKA) for aka in data.get("akas", [])]
-    title.akas.extend(akas)
-    if data.get("has_next_page", False):
-        g_vars["after"] = data["end_cursor"]
-        set_akas(title, spec=spec, headers=headers)
+    """Add the AKAs of a title, page by page.
 
+    If getting a page fails, the AKAs of the previous pages are kept
+    and the raised :class:`PaginationError` contains the cursor
+    to resume from.
+    """
+    flow = akas_flow(title, spec=spec, cursor=cursor, headers=headers)
+    run(flow, _transport(session))
 
-def set_parental_guide(
+
+def parental_guide_flow(
     title: model.Title,
     *,
     headers: dict[str, str] | None = None,
-) -> None:
+) -> Flow[None]:
     spec = _spec("title_parental_guide")
     context = {"imdb_id": title.imdb_id}
-    data = _scrape(spec=spec, context=context, headers=headers)
-    title.certification = deserialize(
-        data["certification"],
-        model.Certification,
+    request = make_request(spec, context=context, headers=headers)
+    data = request.parse((yield request))
+    title.certification = _deserialize(data["certification"],
+                                       model.Certification, spec=spec)
+    title.advisories = _deserialize(data["advisories"], model.Advisories,
+                                    spec=spec)
+
+
+def set_parental_guide(
+    title: model.Title,
+    *,
+    headers: dict[str, str] | None = None,
+    session: Session | None = None,
+) -> None:
+    run(parental_guide_flow(title, headers=headers), _transport(session))
+
+
+# the episodes page of a season lists at most this many episodes,
+# the remaining ones can be reached only through the GraphQL API
+_EPISODES_PAGE_LIMIT = 50
+
+
+def _series_data(title: model.Title) -> dict[str, Any]:
+    data = {
+        "imdb_id": title.imdb_id,
+        "type_id": str(title.type_id),
+        "title": title.title,
+        "primary_image": title.primary_image,
+        "year": title.year,
+        "end_year": getattr(title, "end_year", None),
+    }
+    return {key: value for key, value in data.items() if value is not None}
+
+
+def episodes_paginator(
+    title: model.Title,
+    *,
+    season: str,
+    cursor: str | None = None,
+    headers: dict[str, str] | None = None,
+) -> Paginator:
+    """Get the paginator for the episodes of a season of a series."""
+    return Paginator(
+        _spec("title_episodes_paginated"),
+        context={"imdb_id": title.imdb_id},
+        variables={"filter": {"includeSeasons": season}},
+        headers=headers,
+        cursor=cursor,
     )
-    title.advisories = deserialize(data["advisories"], model.Advisories)
 
 
-def set_episodes(
+def episodes_page(
+    title: model.Title,
+    paginator: Paginator,
+    items: list[Any],
+) -> list[model.Title]:
+    """Get the episodes of a series on a page."""
+    series = _series_data(title)
+    for item in items:
+        item["series"] = series
+    return _deserialize(items, list[model.Title], spec=paginator.spec)
+
+
+def paginated_episodes_flow(
     title: model.Title,
     *,
     season: str,
     headers: dict[str, str] | None = None,
-) -> None:
+) -> Flow[None]:
+    """Flow for getting all episodes of a season through the GraphQL API."""
+    paginator = episodes_paginator(title, season=season, cursor=None,
+                                    headers=headers)
+    series = _series_data(title)
+    episodes: dict[str, Any] = {}
+    while (items := (yield from paginated_flow(paginator))) is not None:
+        for item in items:
+            item["series"] = series
+            episodes[item.get("episode", item["imdb_id"])] = item
+    if title.episodes is None:
+        title.episodes = {}
+    title.episodes[season] = _deserialize(episodes, dict[str, model.Title],
+                                          spec=paginator.spec)
+
+
+def iter_episodes(
+    title: model.Title,
+    *,
+    season: str,
+    cursor: str | None = None,
+    headers: dict[str, str] | None = None,
+    session: Session | None = None,
+) -> Iterator[model.Title]:
+    """Generate the episodes of a season, getting one page at a time.
+
+    The next page is requested only when the episodes of the previous
+    page are consumed, and the title is not modified.
+    """
+    paginator = episodes_paginator(title, season=season, cursor=cursor,
+                                    headers=headers)
+    for items in _iter_pages(paginator, _transport(session)):
+        yield from episodes_page(title, paginator, items)
+
+
+def episodes_flow(
+    title: model.Title,
+    *,
+    season: str,
+    headers: dict[str, str] | None = None,
+) -> Flow[None]:
+    """Flow for getting the episodes of a season.
+
+    If the episodes page of the season is full, the episodes
+    are collected through the paginated GraphQL API instead.
+    If that fails, the episodes on the page are kept.
+    """
     spec = _spec("title_episodes")
     context = {"imdb_id": title.imdb_id, "season": season}
-    data = _scrape(spec=spec, context=context, headers=headers)
+    request = make_request(spec, context=context, headers=headers)
+    data = request.parse((yield request))
     episodes = data.get("episodes")
-    if episodes is not None:
-        if title.episodes is None:
-            title.episodes = {}
-        title.episodes[season] = deserialize(
-            episodes,
-            dict[str, model.Title],
-        )
+    if episodes is None:
+        return
+    if len(episodes) >= _EPISODES_PAGE_LIMIT:
+        try:
+            yield from paginated_episodes_flow(title, season=season,
+                                               headers=headers)
+            return
+        except PaginationError:
+            pass
+    if title.episodes is None:
+        title.episodes = {}
+    title.episodes[season] = _deserialize(episodes, dict[str, model.Title],
+                                          spec=spec)
+
+
+def set_episodes(
+    title: model.Title,
+    *,
+    season: str,
+    headers: dict[str, str] | None = None,
+    session: Session | None = None,
+) -> None:
+    flow = episodes_flow(title, season=season, headers=headers)
+    run(flow, _transport(session))
+
+
+def set_all_episodes(
+    title: model.Title,
+    *,
+    max_workers: int = 4,
+    headers: dict[str, str] | None = None,
+    session: Session | None = None,
+) -> None:
+    """Set the episodes of all seasons of a series, concurrently.
+
+    At most ``max_workers`` seasons are fetched at a time.
+    """
+    if title.seasons is None:
+        return
+    if title.episodes is None:
+        title.episodes = {}
+    transport = _transport(session)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                run,
+                episodes_flow(title, season=season, headers=headers),
+                transport,
+            )
+            for season in title.seasons
+        ]
+        for future in futures:
+            future.result()
+
+
+_UpdateFlow: TypeAlias = Callable[..., Flow[None]]
+
+# flows for the extra data of titles, and the attributes they set
+_TITLE_UPDATES: dict[str, tuple[_UpdateFlow, tuple[str, ...]]] = {
+    "taglines": (taglines_flow, ("taglines",)),
+    "akas": (akas_flow, ("akas",)),
+    "parental_guide": (parental_guide_flow, ("certification", "advisories")),
+}
+
+
+def check_updates(include: Iterable[str]) -> tuple[str, ...]:
+    """Check the names of the extra data to set on titles."""
+    updates = tuple(include)
+    unknown = set(updates) - _TITLE_UPDATES.keys()
+    if len(unknown) > 0:
+        raise ValueError(f"Unknown title data: {', '.join(sorted(unknown))}")
+    return updates
+
+
+def update_flows(
+    imdb_id: str,
+    updates: tuple[str, ...],
+    headers: dict[str, str] | None,
+) -> tuple[model.Title, list[Flow[None]]]:
+    """Get the flows for the extra data of a title.
+
+    The flows set the data on the returned placeholder title.
+    """
+    # the flows need only the IMDb ID, so they can run before the title
+    # is available, by updating a placeholder title
+    placeholder = model.Title(imdb_id=imdb_id, title="",
+                              type_id=model.TitleType.MOVIE)
+    flows = [_TITLE_UPDATES[name][0](placeholder, headers=headers)
+             for name in updates]
+    return placeholder, flows
+
+
+def apply_updates(
+    title: model.Title,
+    placeholder: model.Title,
+    updates: tuple[str, ...],
+) -> None:
+    """Copy the extra data of a title from its placeholder."""
+    for name in updates:
+        for attr in _TITLE_UPDATES[name][1]:
+            setattr(title, attr, getattr(placeholder, attr))
+
+
+@dataclass(kw_only=True)
+class TitleResult:
+    imdb_id: str
+    title: model.Title | None = None
+    error: Exception | None = None
+
+
+def _get_full_title(
+    imdb_id: str,
+    *,
+    include: Iterable[str],
+    headers: dict[str, str] | None,
+    session: Session | None,
+) -> TitleResult:
+    try:
+        title = get_title(imdb_id, include=include, headers=headers,
+                          session=session)
+    except Exception as e:
+        return TitleResult(imdb_id=imdb_id, error=e)
+    return TitleResult(imdb_id=imdb_id, title=title)
+
+
+def get_titles(
+    imdb_ids: Iterable[str],
+    *,
+    include: Iterable[str] = (),
+    max_workers: int = 8,
+    headers: dict[str, str] | None = None,
+    session: Session | None = None,
+) -> Iterator[TitleResult]:
+    """Get many titles concurrently, yielding each one as it completes.
+
+    The names in ``include`` select the extra data to set on the titles,
+    as in :func:`get_title`. Errors are reported in the results
+    of their titles and don't stop the others. At most ``max_workers``
+    titles are fetched at a time and the IDs are consumed only
+    as the workers become free.
+    If no session is given, one is shared by the workers of this call.
+    """
+    updates = check_updates(include)
+    own_session = session is None
+    client = Session(pool_size=max_workers) if session is None else session
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    pending: set[Future[TitleResult]] = set()
+    try:
+        for imdb_id in imdb_ids:
+            if len(pending) >= max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(executor.submit(_get_full_title, imdb_id,
+                                        include=updates, headers=headers,
+                                        session=client))
+        while len(pending) > 0:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        if own_session:
+            client.close()
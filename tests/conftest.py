@@ -1,8 +1,15 @@
+import pytest
+
 import copy
+import gzip
 import json
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import urlparse
 
+import cinemagoerng.aio
 import cinemagoerng.web
 
 
@@ -11,6 +18,7 @@ if not cache_dir.exists():
     cache_dir.mkdir(parents=True, exist_ok=True)
 
 fetch_orig = cinemagoerng.web.fetch
+fetch_orig_async = cinemagoerng.aio.fetch
 
 
 CACHE_SUFFIXES = {
@@ -68,16 +76,124 @@ def get_cache_key(url: str, *, headers: dict[str, str] | None = None) -> str:
     return f"{path}{suffix}"
 
 
-def fetch_cached(url: str, /, *, headers: dict[str, str] | None = None) -> str:
+def fetch_cached(url: str, /, *, headers: dict[str, str] | None = None, session=None, ttl=None, retry=None) -> bytes:
     cache_key = get_cache_key(url, headers=headers)
     cache_path = cache_dir / cache_key
     if cache_key == "title_tt0000001_reference.html":
         cache_path.unlink(missing_ok=True)
     if cache_path.exists():
-        return cache_path.read_text(encoding="utf-8")
-    content = fetch_orig(url, headers=headers)
-    cache_path.write_text(content, encoding="utf-8")
+        return cache_path.read_bytes()
+    content = fetch_orig(url, headers=headers, session=session, ttl=ttl, retry=retry)
+    cache_path.write_bytes(content)
     return content
 
 
 cinemagoerng.web.fetch = fetch_cached
+
+
+async def fetch_cached_async(url: str, /, *, headers: dict[str, str] | None = None, session=None, ttl=None,
+                             retry=None) -> bytes:
+    cache_key = get_cache_key(url, headers=headers)
+    cache_path = cache_dir / cache_key
+    if cache_path.exists():
+        return cache_path.read_bytes()
+    content = await fetch_orig_async(url, headers=headers, session=session, ttl=ttl, retry=retry)
+    cache_path.write_bytes(content)
+    return content
+
+
+cinemagoerng.aio.fetch = fetch_cached_async
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.peers.add(self.client_address)
+        match self.path:
+            case "/redirect":
+                self.send_response(301)
+                self.send_header("Location", "/page")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            case "/page":
+                body = self.headers.get("User-Agent", "").encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            case "/gzip" | "/deflate":
+                encoding = self.path[1:]
+                if encoding not in self.headers.get("Accept-Encoding", ""):
+                    self.send_response(406)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = b"compressed " * 100
+                if encoding == "gzip":
+                    body = gzip.compress(body)
+                else:
+                    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+                    body = compressor.compress(body) + compressor.flush()
+                self.send_response(200)
+                self.send_header("Content-Encoding", encoding)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            case "/chunked":
+                self.send_response(200)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in [b"chunked ", b"content"]:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.write(b"0\r\n\r\n")
+            case "/busy":
+                self.server.busy += 1
+                if self.server.busy == 1:
+                    self.send_response(503)
+                    self.send_header("Retry-After", "0")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+            case "/later":
+                self.send_response(503)
+                self.send_header("Retry-After", "3600")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+            case "/etag":
+                self.server.validators.append(self.headers.get("If-None-Match"))
+                if self.headers.get("If-None-Match") == '"v1"':
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", '"v1"')
+                self.send_header("Content-Type", "text/plain; charset=utf-8")
+                self.send_header("Content-Length", "7")
+                self.end_headers()
+                self.wfile.write(b"content")
+            case _:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.peers = set()
+    httpd.busy = 0
+    httpd.validators = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
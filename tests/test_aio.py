@@ -0,0 +1,231 @@
+import pytest
+
+import asyncio
+import gc
+import json
+import socket
+from urllib.error import HTTPError
+
+from cinemagoerng import aio
+from cinemagoerng.aio import AsyncSession, AsyncSingleFlight
+from cinemagoerng.web import get_title
+from conftest import fetch_orig_async
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_async_session_should_reuse_connection(server):
+    url = f"http://127.0.0.1:{server.server_port}/page"
+
+    async def get_all():
+        async with AsyncSession() as session:
+            return [await session.get(url) for _ in range(3)]
+
+    assert [response.status for response in run(get_all())] == [200, 200, 200]
+    assert len(server.peers) == 1
+
+
+@pytest.mark.parametrize(("path", "content"), [
+    ("/redirect", b"Mozilla/5.0"),
+    ("/gzip", b"compressed "),
+    ("/deflate", b"compressed "),
+    ("/chunked", b"chunked content"),
+])
+def test_async_fetch_should_read_content(server, path, content):
+    url = f"http://127.0.0.1:{server.server_port}{path}"
+    assert run(fetch_orig_async(url)).startswith(content)
+
+
+def test_async_session_should_retry_after_transient_error(server):
+    url = f"http://127.0.0.1:{server.server_port}/busy"
+
+    async def get():
+        async with AsyncSession() as session:
+            return await session.get(url)
+
+    assert run(get()).content == b"ok"
+    assert server.busy == 2
+
+
+def test_async_session_should_raise_http_error_for_error_status(server):
+    url = f"http://127.0.0.1:{server.server_port}/missing"
+
+    async def get():
+        async with AsyncSession() as session:
+            return await session.get(url)
+
+    with pytest.raises(HTTPError) as e:
+        run(get())
+    assert e.value.code == 404
+
+
+@pytest.mark.parametrize(("data",), [(b"",), (b"zz\r\n",), (b"5\r\nhello\r\n",)])
+def test_async_chunked_body_should_raise_connection_error_for_broken_chunk_size(data):
+    async def read():
+        reader = asyncio.StreamReader()
+        reader.feed_data(data)
+        reader.feed_eof()
+        return [chunk async for chunk in aio._read_chunked(reader)]
+
+    with pytest.raises(ConnectionResetError):
+        run(read())
+
+
+def test_async_session_should_time_out_while_connecting():
+    with socket.create_server(("127.0.0.1", 0)) as listener:  # never answers the TLS handshake
+        url = f"https://127.0.0.1:{listener.getsockname()[1]}/"
+
+        async def send():
+            async with AsyncSession(timeout=0.2) as session:
+                return await session._send(url, {})
+
+        with pytest.raises(TimeoutError):
+            run(send())
+
+
+def test_async_fetch_should_reuse_default_session_in_loop(server):
+    url = f"http://127.0.0.1:{server.server_port}/page"
+
+    async def fetch_all():
+        return [await fetch_orig_async(url) for _ in range(3)]
+
+    run(fetch_all())
+    assert len(server.peers) == 1
+
+
+def test_async_default_session_should_be_closed_with_loop(server):
+    url = f"http://127.0.0.1:{server.server_port}/page"
+
+    async def get_session():
+        await fetch_orig_async(url)
+        return await aio.default_session()
+
+    session = run(get_session())
+    assert session is not run(get_session())
+    assert len(session._idle) == 0
+
+
+def test_async_default_sessions_should_not_keep_closed_loops(server):
+    url = f"http://127.0.0.1:{server.server_port}/page"
+    for _ in range(3):
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(fetch_orig_async(url))  # keeps an idle connection
+        loop.close()
+    del loop
+    gc.collect()
+    assert len(aio._DEFAULT_SESSIONS) <= 1
+    run(fetch_orig_async(url))
+    gc.collect()
+    assert len(aio._DEFAULT_SESSIONS) == 0
+
+
+@pytest.mark.parametrize(("imdb_id",), [
+    ("tt0133093",),  # The Matrix
+])
+def test_async_get_title_should_get_same_title_as_sync(imdb_id):
+    parsed = run(aio.get_title(imdb_id=imdb_id))
+    assert repr(parsed) == repr(get_title(imdb_id=imdb_id))
+    assert parsed.cast == get_title(imdb_id=imdb_id).cast
+
+
+def test_async_single_flight_should_run_concurrent_calls_with_same_key_once():
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def call_all():
+        flights = AsyncSingleFlight()
+        return await asyncio.gather(*[flights.do("k", call) for _ in range(4)])
+
+    assert run(call_all()) == [("result", True)] * 4
+    assert len(calls) == 1
+
+
+def test_async_single_flight_should_give_result_to_followers_when_leader_is_cancelled():
+    async def call():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def call_all():
+        flights = AsyncSingleFlight()
+        leader = asyncio.create_task(flights.do("k", call))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flights.do("k", call))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert run(call_all()) == ("result", True)
+
+
+def test_async_single_flight_should_cancel_call_when_all_callers_are_cancelled():
+    cancelled = []
+
+    async def call():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def call_all():
+        flights = AsyncSingleFlight()
+        callers = [asyncio.create_task(flights.do("k", call)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        return flights._calls
+
+    assert run(call_all()) == {}
+    assert cancelled == [1]
+
+
+def test_async_get_title_should_coalesce_concurrent_requests_without_session(monkeypatch):
+    urls = []
+
+    async def slow_fetch(url, *, headers=None, session=None, ttl=None, retry=None):
+        urls.append(url)
+        await asyncio.sleep(0.1)
+        data = {"props": {"pageProps": {"aboveTheFoldData": {
+            "id": "tt0133093", "titleType": {"id": "movie"}, "originalTitleText": {"text": "The Matrix"},
+        }}}}
+        return f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'.encode()
+
+    async def get_all():
+        return await asyncio.gather(*[aio.get_title("tt0133093", lazy=True) for _ in range(2)])
+
+    monkeypatch.setattr(aio, "fetch", slow_fetch)
+    titles = run(get_all())
+    assert len(urls) == 1
+    assert [title.title for title in titles] == ["The Matrix"] * 2
+
+
+def test_async_get_title_should_cancel_other_flows_when_one_fails(monkeypatch):
+    cancelled = []
+
+    async def fake_fetch(url, *, headers=None, session=None, ttl=None, retry=None):
+        if "taglines" in url:
+            raise HTTPError(url, 404, "Not Found", {}, None)
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(url)
+            raise
+
+    async def get():
+        with pytest.raises(HTTPError):
+            await aio.get_title("tt0133093", include=["taglines"])
+        await asyncio.sleep(0)
+        return list(cancelled)
+
+    monkeypatch.setattr(aio, "fetch", fake_fetch)
+    assert len(run(get())) == 1
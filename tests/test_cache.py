@@ -0,0 +1,167 @@
+import pytest
+
+import asyncio
+import json
+import threading
+import time
+from urllib.parse import quote
+
+from cinemagoerng import aio, web
+from cinemagoerng.cache import CacheEntry, DiskCache, HTTPCache, MemoryCache, ResultCache, SQLiteCache, cache_key
+from cinemagoerng.model import make_movie
+from cinemagoerng.session import Session
+
+
+def make_entry(content, *, ttl=60.0):
+    return CacheEntry(url="https://www.imdb.com/", content=content, headers={"ETag": '"v1"'},
+                      stored=time.time(), ttl=ttl)
+
+
+@pytest.fixture(params=["memory", "disk", "sqlite"])
+def make_backend(request, tmp_path):
+    def make(max_bytes):
+        match request.param:
+            case "memory":
+                return MemoryCache(max_bytes=max_bytes)
+            case "disk":
+                return DiskCache(tmp_path / "cache", max_bytes=max_bytes)
+            case "sqlite":
+                return SQLiteCache(tmp_path / "cache.db", max_bytes=max_bytes)
+    return make
+
+
+def test_cache_backend_should_get_stored_entry(make_backend):
+    backend = make_backend(1000)
+    backend.set("k", make_entry(b"content"))
+    entry = backend.get("k")
+    assert (entry.content, entry.headers) == (b"content", {"ETag": '"v1"'})
+    backend.delete("k")
+    assert backend.get("k") is None
+
+
+def test_cache_backend_should_evict_least_recently_used_entries_over_size(make_backend):
+    backend = make_backend(1600)
+    for key in ["a", "b", "c"]:
+        backend.set(key, make_entry(key.encode() * 400))
+        time.sleep(0.01)
+    assert backend.get("a") is not None
+    time.sleep(0.01)
+    backend.set("d", make_entry(b"d" * 400))
+    assert [key for key in "abcd" if backend.get(key) is not None] == ["a", "c", "d"]
+
+
+def test_disk_cache_should_keep_entries_between_instances(tmp_path):
+    DiskCache(tmp_path).set("k", make_entry(b"content"))
+    assert DiskCache(tmp_path).get("k").content == b"content"
+
+
+def test_cache_key_should_ignore_irrelevant_graphql_variables():
+    def url(variables):
+        return f"https://caching.graphql.imdb.com/?variables={quote(json.dumps(variables))}&operationName=X"
+
+    key = cache_key(url({"const": "tt0133093", "locale": "en-US"}), {"User-Agent": "a"})
+    assert key == cache_key(url({"locale": "de-DE", "const": "tt0133093"}), {"User-Agent": "b"})
+    assert key != cache_key(url({"const": "tt0133093", "first": 50}))
+    assert key != cache_key(url({"const": "tt0133093"}), {"Accept-Language": "de"})
+
+
+def test_session_should_get_fresh_response_from_cache(server):
+    url = f"http://127.0.0.1:{server.server_port}/etag"
+    with Session(cache=HTTPCache()) as session:
+        assert [session.get(url).content for _ in range(2)] == [b"content", b"content"]
+    assert server.validators == [None]
+
+
+def test_session_should_revalidate_stale_response(server):
+    url = f"http://127.0.0.1:{server.server_port}/etag"
+    with Session(cache=HTTPCache(ttl=0.0)) as session:
+        responses = [session.get(url) for _ in range(2)]
+    assert [(r.status, r.content) for r in responses] == [(200, b"content"), (200, b"content")]
+    assert responses[1].headers.get_content_charset() == "utf-8"
+    assert server.validators == [None, '"v1"']
+
+
+def test_async_session_should_revalidate_stale_response(server):
+    url = f"http://127.0.0.1:{server.server_port}/etag"
+
+    async def get_all():
+        async with aio.AsyncSession(cache=HTTPCache()) as session:
+            return [await session.get(url, ttl=0.0) for _ in range(2)]
+
+    assert [response.content for response in asyncio.run(get_all())] == [b"content", b"content"]
+    assert server.validators == [None, '"v1"']
+
+
+class ThreadRecordingDiskCache(DiskCache):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def get(self, key):
+        self.threads.add(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, entry):
+        self.threads.add(threading.get_ident())
+        super().set(key, entry)
+
+
+def test_async_session_should_use_persistent_cache_outside_event_loop(server, tmp_path):
+    url = f"http://127.0.0.1:{server.server_port}/etag"
+    backend = ThreadRecordingDiskCache(tmp_path / "cache")
+
+    async def get_all():
+        async with aio.AsyncSession(cache=HTTPCache(backend)) as session:
+            return [await session.get(url) for _ in range(2)]
+
+    assert [response.content for response in asyncio.run(get_all())] == [b"content", b"content"]
+    assert len(backend.threads) > 0
+    assert threading.get_ident() not in backend.threads
+
+
+def test_result_cache_should_tell_stale_data_until_it_expires(monkeypatch):
+    cache = ResultCache(ttl=10.0, stale_ttl=20.0)
+    cache.set("k", {"title": "The Matrix"})
+    now = time.time()
+    for delay, expected in [(5, ({"title": "The Matrix"}, False)), (15, ({"title": "The Matrix"}, True)),
+                            (35, (None, False))]:
+        monkeypatch.setattr(time, "time", lambda: now + delay)
+        assert cache.get("k") == expected
+
+
+def test_result_cache_should_allow_one_refresh_at_a_time():
+    cache = ResultCache()
+    assert cache.claim_refresh("k")
+    assert not cache.claim_refresh("k")
+    cache.release_refresh("k")
+    assert cache.claim_refresh("k")
+
+
+def test_result_cache_should_not_keep_data_of_error_replies(monkeypatch):
+    replies = [json.dumps({"errors": [{"message": "PersistedQueryNotFound"}], "data": None}).encode(),
+               json.dumps({"data": {"title": {"akas": {"edges": [], "pageInfo": {"hasNextPage": False}}}}}).encode()]
+    monkeypatch.setattr(web, "fetch", lambda url, *, headers=None, session=None, ttl=None, retry=None: replies.pop(0))
+    cache = ResultCache()
+    transport = web._transport(Session(result_cache=cache))
+    request = web.akas_paginator(make_movie(imdb_id="tt0133093", title="The Matrix")).next_request()
+    assert transport(request).data == {}
+    assert transport(request).data == {"has_next_page": False}
+    assert cache.get(web.result_key(request)) == ({"has_next_page": False}, False)
+
+
+def test_async_result_cache_should_use_persistent_backend_outside_event_loop(monkeypatch, tmp_path):
+    async def fake_fetch(url, *, headers=None, session=None, ttl=None, retry=None):
+        return json.dumps({"data": {"title": {"akas": {"edges": [], "pageInfo": {"hasNextPage": False}}}}}).encode()
+
+    monkeypatch.setattr(aio, "fetch", fake_fetch)
+    backend = ThreadRecordingDiskCache(tmp_path / "cache")
+    request = web.akas_paginator(make_movie(imdb_id="tt0133093", title="The Matrix")).next_request()
+
+    async def get_all():
+        async with aio.AsyncSession(result_cache=ResultCache(backend)) as session:
+            transport = aio._transport(session)
+            return [(await transport(request)).data for _ in range(2)]
+
+    assert asyncio.run(get_all()) == [{"has_next_page": False}] * 2
+    assert len(backend.threads) > 0
+    assert threading.get_ident() not in backend.threads
@@ -0,0 +1,63 @@
+import pytest
+
+import json
+
+from cinemagoerng import hooks, web
+from cinemagoerng.hooks import SpanObserver, StageEvent
+
+
+PAGE = ('<html><script id="__NEXT_DATA__" type="application/json">%s</script></html>' % json.dumps(
+    {"props": {"pageProps": {"aboveTheFoldData": {
+        "id": "tt0133093", "titleType": {"id": "movie"}, "originalTitleText": {"text": "The Matrix"},
+    }}}}
+)).encode()
+
+
+@pytest.fixture
+def events(monkeypatch):
+    monkeypatch.setattr(web, "fetch", lambda url, **kwargs: PAGE)
+    events = []
+    hooks.add_observer(events.append)
+    yield events
+    hooks.remove_observer(events.append)
+
+
+def test_observer_should_get_all_stages_of_scraping(events):
+    web.get_title("tt0133093")
+    assert [event.stage for event in events] == [
+        "network", "build_tree", "preprocess", "extract", "postprocess", "deserialize",
+    ]
+    assert all(event.spec == "title_reference" for event in events)
+    assert all(event.duration >= 0.0 for event in events)
+    assert [event.size for event in events[:3]] == [len(PAGE), len(PAGE), None]
+    assert events[0].url == "https://www.imdb.com/title/tt0133093/reference/"
+
+
+def test_removed_observer_should_not_get_stages(events):
+    hooks.remove_observer(events.append)
+    web.get_title("tt0133093")
+    hooks.add_observer(events.append)
+    assert events == []
+
+
+def test_span_observer_should_record_stage_as_span():
+    spans = []
+
+    class Span:
+        def __init__(self, name, attributes, start_time):
+            self.name, self.attributes, self.start_time = name, attributes, start_time
+
+        def end(self, end_time):
+            self.end_time = end_time
+            spans.append(self)
+
+    class Tracer:
+        def start_span(self, name, *, attributes, start_time):
+            return Span(name, attributes, start_time)
+
+    observer = SpanObserver(Tracer())
+    observer(StageEvent(stage="network", spec="title_reference", started=10.0, duration=0.5, size=100, url="u"))
+    [span] = spans
+    assert span.name == "cinemagoerng.network"
+    assert span.attributes == {"cinemagoerng.spec": "title_reference", "cinemagoerng.size": 100, "url.full": "u"}
+    assert (span.start_time, span.end_time) == (10_000_000_000, 10_500_000_000)
@@ -0,0 +1,96 @@
+import pytest
+
+import asyncio
+import json
+from functools import partial
+
+from cinemagoerng import metrics, web
+from cinemagoerng.aio import AsyncSession
+from cinemagoerng.cache import HTTPCache
+from cinemagoerng.metrics import Registry
+from cinemagoerng.session import Session
+from conftest import fetch_orig, fetch_orig_async
+
+
+def test_registry_should_render_counter_in_prometheus_text_format():
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests, per host.", ["host"])
+    counter.inc(host="www.imdb.com")
+    counter.inc(2.5, host='a"b')
+    assert registry.render() == (
+        "# HELP requests_total Requests, per host.\n"
+        "# TYPE requests_total counter\n"
+        'requests_total{host="a\\"b"} 2.5\n'
+        'requests_total{host="www.imdb.com"} 1\n'
+    )
+
+
+def test_registry_should_render_histogram_with_cumulative_buckets():
+    registry = Registry()
+    histogram = registry.histogram("parse_seconds", "Parse time.", ["spec"], buckets=[0.1, 1.0])
+    for value in [0.05, 0.1, 0.5, 3.0]:
+        histogram.observe(value, spec="title")
+    assert registry.render().splitlines()[2:] == [
+        'parse_seconds_bucket{spec="title",le="0.1"} 2',
+        'parse_seconds_bucket{spec="title",le="1"} 3',
+        'parse_seconds_bucket{spec="title",le="+Inf"} 4',
+        'parse_seconds_sum{spec="title"} 3.65',
+        'parse_seconds_count{spec="title"} 4',
+    ]
+
+
+def test_metric_should_reject_wrong_labels():
+    counter = Registry().counter("requests_total", "Requests.", ["host"])
+    with pytest.raises(ValueError):
+        counter.inc(spec="title")
+
+
+def test_registry_should_reject_duplicate_metric():
+    registry = Registry()
+    registry.counter("requests_total", "Requests.")
+    with pytest.raises(ValueError):
+        registry.counter("requests_total", "Requests.")
+
+
+def test_session_should_count_requests_bytes_and_retries(server):
+    url = f"http://127.0.0.1:{server.server_port}/busy"
+    before = [metric.get(host="127.0.0.1") for metric in (metrics.REQUESTS, metrics.RESPONSE_BYTES, metrics.RETRIES)]
+    with Session() as session:
+        session.get(url)
+    after = [metric.get(host="127.0.0.1") for metric in (metrics.REQUESTS, metrics.RESPONSE_BYTES, metrics.RETRIES)]
+    assert [a - b for a, b in zip(after, before)] == [2, 2, 1]
+
+
+@pytest.mark.parametrize(("path",), [("/gzip",), ("/deflate",)])
+def test_response_bytes_should_be_counted_before_decompression(server, path):
+    url = f"http://127.0.0.1:{server.server_port}{path}"
+    for fetch in (fetch_orig, partial(fetch_orig, session=Session()),
+                  lambda url: asyncio.run(fetch_orig_async(url, session=AsyncSession()))):
+        before = metrics.RESPONSE_BYTES.get(host="127.0.0.1")
+        assert len(fetch(url)) == 1100
+        assert 0 < metrics.RESPONSE_BYTES.get(host="127.0.0.1") - before < 100
+
+
+def test_session_should_count_cache_hits_and_misses(server):
+    url = f"http://127.0.0.1:{server.server_port}/etag"
+    results = ["hit", "miss", "revalidated"]
+    before = [metrics.CACHE_LOOKUPS.get(cache="http", result=result) for result in results]
+    with Session(cache=HTTPCache()) as session:
+        for _ in range(3):
+            session.get(url)
+    after = [metrics.CACHE_LOOKUPS.get(cache="http", result=result) for result in results]
+    assert [a - b for a, b in zip(after, before)] == [2, 1, 0]
+
+
+def test_get_title_should_record_parse_and_deserialize_latency(monkeypatch):
+    data = {"props": {"pageProps": {"aboveTheFoldData": {
+        "id": "tt0133093", "titleType": {"id": "movie"}, "originalTitleText": {"text": "The Matrix"},
+    }}}}
+    page = f'<script id="__NEXT_DATA__" type="application/json">{json.dumps(data)}</script>'.encode()
+    monkeypatch.setattr(web, "fetch", lambda url, **kwargs: page)
+    before = [metric.get(spec="title_reference")[0]
+              for metric in (metrics.PARSE_SECONDS, metrics.DESERIALIZE_SECONDS)]
+    web.get_title("tt0133093")
+    after = [metric.get(spec="title_reference")[0] for metric in (metrics.PARSE_SECONDS, metrics.DESERIALIZE_SECONDS)]
+    assert [a - b for a, b in zip(after, before)] == [1, 1]
+    assert "# TYPE cinemagoerng_parse_seconds histogram" in metrics.render()
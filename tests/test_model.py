@@ -1,6 +1,10 @@
 import pytest
 
-from cinemagoerng.model import AKA, CrewCredit, Person, Title, TitleType, make_movie
+import pickle
+
+from cinemagoerng.model import AKA, CastCredit, CrewCredit, Interner, Person, Title, TitleType, defer, make_movie
+from cinemagoerng.piculet import serialize
+from cinemagoerng.web import deserialize
 
 
 @pytest.mark.parametrize(("imdb_id", "title", "type_id", "attr", "value"), [
@@ -56,6 +60,17 @@ def test_title_should_not_have_unsupported_attribute(imdb_id, title, type_id, at
         assert title.__getattribute__(attr) is None
 
 
+@pytest.mark.parametrize(("imdb_id", "title", "type_id", "attr"), [
+    ("tt0133093", "The Matrix", TitleType.MOVIE, "episodes"),
+    ("tt1000252", "Blink", TitleType.TV_EPISODE, "seasons"),
+])
+def test_title_should_not_have_unsupported_attribute_after_unpickling(imdb_id, title, type_id, attr):
+    unpickled = pickle.loads(pickle.dumps(Title(type_id=type_id, imdb_id=imdb_id, title=title)))
+    assert isinstance(unpickled, Title)
+    assert (unpickled.imdb_id, unpickled.title) == (imdb_id, title)
+    assert not hasattr(unpickled, attr)
+
+
 @pytest.mark.parametrize(("imdb_id", "title", "country_codes", "countries"), [
     ("tt0133093", "The Matrix", ["US", "AU"], ["United States", "Australia"]),
     ("tt0389150", "The Matrix Defence", ["GB"], ["United Kingdom"]),
@@ -141,3 +156,75 @@ def test_title_credit_as_name_should_return_just_name(imdb_id, name, notes, as_n
 def test_title_uncredited_should_return_boolean(imdb_id, name, notes, uncredited):
     credit = CrewCredit(Person(imdb_id=imdb_id, name=name), notes=notes)
     assert credit.uncredited == uncredited
+
+
+@pytest.mark.parametrize(("data", "credit"), [
+    ({"person": {"imdb_id": "nm0000206", "name": "Keanu Reeves"}, "characters": ["Neo"]},
+        CastCredit(Person(imdb_id="nm0000206", name="Keanu Reeves"), characters=["Neo"])),
+    ({"person": {"imdb_id": "nm0000401", "name": "Laurence Fishburne"}, "notes": ["uncredited"], "characters": []},
+        CastCredit(Person(imdb_id="nm0000401", name="Laurence Fishburne"), notes=["uncredited"])),
+])
+def test_deserialize_should_generate_credit(data, credit):
+    assert deserialize(data, CastCredit) == credit
+
+
+@pytest.mark.parametrize(("data",), [
+    ({"person": {"imdb_id": "nm0000206", "name": "Keanu Reeves"}, "job": "actor"},),
+    ({"person": {"imdb_id": "nm0000206", "name": 206}},),
+    ({"person": {"imdb_id": "nm0000206"}},),
+    ({"person": {"imdb_id": "nm0000206", "name": "Keanu Reeves"}, "characters": "Neo"},),
+])
+def test_deserialize_should_reject_invalid_credit(data):
+    with pytest.raises((TypeError, ValueError)):
+        _ = deserialize(data, CastCredit)
+
+
+def test_credit_should_not_have_instance_dict():
+    credit = CastCredit(Person(imdb_id="nm0000206", name="Keanu Reeves"), characters=["Neo"])
+    assert not hasattr(credit, "__dict__")
+    assert not hasattr(credit.person, "__dict__")
+
+
+def test_interner_should_share_equal_persons_between_titles():
+    interner = Interner()
+    movie1 = make_movie(imdb_id="tt0133093", title="The Matrix",
+                        cast=[CastCredit(Person(imdb_id="nm0000206", name="Keanu Reeves"))])
+    movie2 = make_movie(imdb_id="tt0111257", title="Speed",
+                        cast=[CastCredit(Person(imdb_id="nm0000206", name="Keanu Reeves"))],
+                        directors=[CrewCredit(Person(imdb_id="nm0000957", name="Jan de Bont"))])
+    interner.title(movie1)
+    interner.title(movie2)
+    assert movie1.cast[0].person is movie2.cast[0].person
+    assert len(interner) == 2
+
+
+def test_deferred_title_attribute_should_be_loaded_on_first_access():
+    movie = make_movie(imdb_id="tt0133093", title="The Matrix")
+    calls = []
+    defer(movie, "cast", lambda: calls.append(1) or [CastCredit(Person(imdb_id="nm0000206", name="Keanu Reeves"))])
+    assert calls == []
+    assert movie.cast[0].name == "Keanu Reeves"
+    assert movie.cast[0].name == "Keanu Reeves"
+    assert calls == [1]
+
+
+def test_deferred_title_attribute_should_be_loaded_when_pickled():
+    movie = make_movie(imdb_id="tt0133093", title="The Matrix")
+    defer(movie, "cast", lambda: [CastCredit(Person(imdb_id="nm0000206", name="Keanu Reeves"))])
+    unpickled = pickle.loads(pickle.dumps(movie))
+    assert unpickled.cast[0].name == "Keanu Reeves"
+
+
+def test_deferred_title_attribute_should_be_loaded_when_serialized():
+    movie = make_movie(imdb_id="tt0133093", title="The Matrix")
+    defer(movie, "cast", lambda: [CastCredit(Person(imdb_id="nm0000206", name="Keanu Reeves"))])
+    assert "_pending" not in movie.__dict__
+    data = serialize(movie)
+    assert data["cast"][0]["person"]["name"] == "Keanu Reeves"
+    assert "_pending" not in data
+
+
+def test_defer_should_reject_non_lazy_attribute():
+    movie = make_movie(imdb_id="tt0133093", title="The Matrix")
+    with pytest.raises(ValueError):
+        defer(movie, "genres", list)
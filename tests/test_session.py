@@ -0,0 +1,171 @@
+import pytest
+
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError
+
+from cinemagoerng.session import ContentDecoder, Rate, RateLimiter, Retry, Session, SingleFlight, parse_retry_after
+from conftest import fetch_orig
+
+
+def test_session_should_reuse_connection(server):
+    url = f"http://127.0.0.1:{server.server_port}/page"
+    with Session() as session:
+        for _ in range(3):
+            assert session.get(url).status == 200
+    assert len(server.peers) == 1
+
+
+def test_session_should_follow_redirections(server):
+    url = f"http://127.0.0.1:{server.server_port}/redirect"
+    with Session() as session:
+        response = session.get(url, headers={"User-Agent": "test"})
+    assert response.url.endswith("/page")
+    assert response.content == b"test"
+
+
+def test_session_should_raise_http_error_for_error_status(server):
+    url = f"http://127.0.0.1:{server.server_port}/missing"
+    with Session() as session, pytest.raises(HTTPError) as e:
+        session.get(url)
+    assert e.value.code == 404
+
+
+def test_fetch_should_use_session(server):
+    url = f"http://127.0.0.1:{server.server_port}/page"
+    with Session() as session:
+        content = fetch_orig(url, session=session)
+    assert content.startswith(b"Mozilla/5.0")
+
+
+@pytest.mark.parametrize(("path",), [("/gzip",), ("/deflate",)])
+def test_session_should_decompress_content(server, path):
+    url = f"http://127.0.0.1:{server.server_port}{path}"
+    with Session() as session:
+        response = session.get(url, headers={"Accept-Encoding": "gzip, deflate"})
+    assert response.content == b"compressed " * 100
+
+
+@pytest.mark.parametrize(("path",), [("/gzip",), ("/deflate",)])
+def test_fetch_should_request_compressed_content(server, path):
+    url = f"http://127.0.0.1:{server.server_port}{path}"
+    assert fetch_orig(url) == b"compressed " * 100
+    with Session() as session:
+        assert fetch_orig(url, session=session) == b"compressed " * 100
+
+
+@pytest.mark.parametrize(("wbits",), [(zlib.MAX_WBITS,), (-zlib.MAX_WBITS,)])
+def test_content_decoder_should_decode_deflate_data_with_one_byte_first_chunk(wbits):
+    compressor = zlib.compressobj(wbits=wbits)
+    data = compressor.compress(b"compressed " * 100) + compressor.flush()
+    decoder = ContentDecoder("deflate")
+    chunks = [decoder.decode(data[:1]), decoder.decode(data[1:]), decoder.flush()]
+    assert b"".join(chunks) == b"compressed " * 100
+    assert decoder.received == len(data)
+
+
+def test_session_should_retry_after_transient_error(server):
+    url = f"http://127.0.0.1:{server.server_port}/busy"
+    with Session() as session:
+        assert session.get(url).content == b"ok"
+    assert server.busy == 2
+
+
+def test_session_should_raise_transient_error_when_retries_run_out(server):
+    url = f"http://127.0.0.1:{server.server_port}/busy"
+    with Session(retry=Retry(attempts=0)) as session, pytest.raises(HTTPError) as e:
+        session.get(url)
+    assert e.value.code == 503
+
+
+def test_session_should_use_retry_policy_given_for_request(server):
+    url = f"http://127.0.0.1:{server.server_port}/busy"
+    with Session() as session, pytest.raises(HTTPError) as e:
+        session.get(url, retry=Retry(attempts=0))
+    assert e.value.code == 503
+    assert server.busy == 1
+
+
+def test_session_should_not_wait_for_retry_after_over_limit(server):
+    url = f"http://127.0.0.1:{server.server_port}/later"
+    with Session() as session, pytest.raises(HTTPError) as e:
+        session.get(url)
+    assert e.value.code == 503
+    assert session.limiter.reserve("127.0.0.1") == 0.0
+
+
+def test_rate_limiter_should_delay_requests_after_burst():
+    limiter = RateLimiter({"www.imdb.com": Rate(per_second=10.0, burst=2)})
+    delays = [limiter.reserve("www.imdb.com") for _ in range(3)]
+    assert delays[:2] == [0.0, 0.0]
+    assert 0.05 < delays[2] <= 0.1
+    assert limiter.reserve("caching.graphql.imdb.com") == 0.0
+
+
+def test_rate_limiter_should_delay_requests_to_paused_host():
+    limiter = RateLimiter({"www.imdb.com": Rate(per_second=100.0, burst=10)})
+    limiter.pause("www.imdb.com", 5.0)
+    assert limiter.reserve("www.imdb.com") > 4.9
+
+
+@pytest.mark.parametrize(("value", "seconds"), [
+    ("120", 120.0),
+    ("Wed, 21 Oct 2015 07:28:00 GMT", 0.0),
+    ("soon", None),
+    (None, None),
+])
+def test_parse_retry_after_should_get_seconds_to_wait(value, seconds):
+    assert parse_retry_after(value) == seconds
+
+
+def test_retry_delay_should_grow_exponentially_with_jitter():
+    retry = Retry(backoff=1.0, max_backoff=4.0)
+    assert all(0.0 <= retry.delay(attempt) <= min(2 ** attempt, 4.0) for attempt in range(5) for _ in range(20))
+    assert retry.delay(0, retry_after=7.0) == 7.0
+
+
+def test_retry_should_not_allow_retry_after_over_limit():
+    retry = Retry(attempts=2, max_retry_after=60.0)
+    assert retry.allows(1, retry_after=60.0)
+    assert not retry.allows(1, retry_after=61.0)
+    assert not retry.allows(2)
+    assert retry.delay(0, retry_after=3600.0) == 60.0
+
+
+def test_single_flight_should_run_concurrent_calls_with_same_key_once():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def call():
+        calls.append(1)
+        release.wait(timeout=5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flights.do, "k", call) for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        results = [future.result() for future in futures]
+    assert results == [("result", True)] * 4
+    assert len(calls) == 1
+    assert flights.do("k", lambda: "again") == ("again", False)
+
+
+def test_single_flight_should_raise_error_of_call_for_all_callers():
+    flights = SingleFlight()
+    release = threading.Event()
+
+    def call():
+        release.wait(timeout=5)
+        raise LookupError("tt0000000")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(flights.do, "k", call) for _ in range(2)]
+        time.sleep(0.1)
+        release.set()
+        for future in futures:
+            with pytest.raises(LookupError):
+                future.result()
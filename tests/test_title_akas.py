@@ -1,6 +1,21 @@
 import pytest
 
+import json
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qs, urlparse
+
 from cinemagoerng import web as imdb
+from cinemagoerng.model import make_movie
+
+
+def get_variables(request):
+    return json.loads(parse_qs(urlparse(request.url).query)["variables"][0])
+
+
+def make_akas_page(titles, cursor):
+    edges = [{"node": {"displayableProperty": {"value": {"plainText": t}}, "country": {"id": "US"}}} for t in titles]
+    page_info = {"hasNextPage": cursor is not None, "endCursor": cursor}
+    return json.dumps({"data": {"title": {"akas": {"edges": edges, "pageInfo": page_info}}}}).encode()
 
 
 @pytest.mark.parametrize(("imdb_id", "n_before", "n_after", "akas"), [
@@ -27,3 +42,128 @@ def test_title_akas_parser_should_set_all_akas_on_update(imdb_id, n_before, n_af
     if len(akas) > 0:
         assert [(aka.title, aka.country_code, aka.country, aka.language_code, aka.language, aka.notes)
                 for aka in parsed.akas] == akas
+
+
+def test_title_akas_flow_should_follow_cursor_through_given_transport():
+    pages = {"null": make_akas_page(["A", "B"], "c1"), "c1": make_akas_page(["C"], None)}
+    requests = []
+
+    def transport(request):
+        requests.append(request)
+        return pages[get_variables(request)["after"]]
+
+    title = make_movie(imdb_id="tt0133093", title="The Matrix")
+    imdb.run(imdb.akas_flow(title), transport)
+    assert [aka.title for aka in title.akas] == ["A", "B", "C"]
+    assert all(request.headers == {"Content-Type": "application/json"} for request in requests)
+    assert imdb._spec("title_akas").graphql["variables"]["after"] == "null"
+
+
+def test_title_akas_flow_should_retry_page_with_smaller_size_after_server_error():
+    sizes = []
+
+    def transport(request):
+        size = get_variables(request)["first"]
+        sizes.append(size)
+        if size > 20:
+            raise HTTPError(request.url, 503, "Service Unavailable", {}, None)
+        return make_akas_page(["A"], None)
+
+    title = make_movie(imdb_id="tt0133093", title="The Matrix")
+    imdb.run(imdb.akas_flow(title), transport)
+    assert sizes == [50, 25, 12]
+    assert [aka.title for aka in title.akas] == ["A"]
+
+
+def test_paginator_should_retry_page_after_retry_after_delay_without_shrinking_when_rate_limited():
+    title = make_movie(imdb_id="tt0133093", title="The Matrix")
+    paginator = imdb.akas_paginator(title)
+    request = paginator.next_request()
+    paginator.fail(HTTPError(request.url, 429, "Too Many Requests", {"Retry-After": "7"}, None))
+    retried = paginator.next_request()
+    assert get_variables(retried)["first"] == 50
+    assert retried.delay == 7.0
+
+
+@pytest.mark.parametrize(("error", "size"), [
+    (URLError(OSError("Name or service not known")), 50),
+    (ConnectionResetError(), 50),
+    (URLError(TimeoutError()), 25),
+    (TimeoutError(), 25),
+])
+def test_paginator_should_shrink_page_only_after_server_errors_and_timeouts(error, size):
+    title = make_movie(imdb_id="tt0133093", title="The Matrix")
+    paginator = imdb.akas_paginator(title)
+    paginator.fail(error)
+    retried = paginator.next_request()
+    assert get_variables(retried)["first"] == size
+    assert 0 <= retried.delay <= paginator.retry.backoff
+
+
+def test_paginator_should_raise_pagination_error_when_retry_after_is_over_limit():
+    title = make_movie(imdb_id="tt0133093", title="The Matrix")
+    paginator = imdb.akas_paginator(title)
+    request = paginator.next_request()
+    with pytest.raises(imdb.PaginationError):
+        paginator.fail(HTTPError(request.url, 429, "Too Many Requests", {"Retry-After": "3600"}, None))
+
+
+def test_paginator_should_not_let_transports_retry_pages():
+    title = make_movie(imdb_id="tt0133093", title="The Matrix")
+    paginator = imdb.akas_paginator(title)
+    assert paginator.next_request().retry.attempts == 0
+
+
+def test_paginator_should_raise_pagination_error_when_retries_run_out():
+    title = make_movie(imdb_id="tt0133093", title="The Matrix")
+    paginator = imdb.akas_paginator(title)
+    for _ in range(paginator.retry.attempts):
+        paginator.fail(ConnectionResetError())
+    with pytest.raises(imdb.PaginationError):
+        paginator.fail(ConnectionResetError())
+
+
+def test_paginator_should_reset_delay_after_successful_page():
+    title = make_movie(imdb_id="tt0133093", title="The Matrix")
+    paginator = imdb.akas_paginator(title)
+    request = paginator.next_request()
+    paginator.fail(HTTPError(request.url, 503, "Service Unavailable", {"Retry-After": "3"}, None))
+    request = paginator.next_request()
+    paginator.receive(request, make_akas_page(["A"], "c1"))
+    assert paginator.next_request().delay == 0.0
+
+
+def test_title_akas_flow_should_resume_from_cursor_of_failed_page():
+    pages = {"null": make_akas_page(["A", "B"], "c1"), "c1": make_akas_page(["C"], None)}
+
+    def failing_transport(request):
+        cursor = get_variables(request)["after"]
+        if cursor == "c1":
+            raise HTTPError(request.url, 404, "Not Found", {}, None)
+        return pages[cursor]
+
+    title = make_movie(imdb_id="tt0133093", title="The Matrix")
+    with pytest.raises(imdb.PaginationError) as e:
+        imdb.run(imdb.akas_flow(title), failing_transport)
+    assert e.value.cursor == "c1"
+    imdb.run(imdb.akas_flow(title, cursor=e.value.cursor), lambda request: pages[get_variables(request)["after"]])
+    assert [aka.title for aka in title.akas] == ["A", "B", "C"]
+
+
+def test_iter_akas_should_get_next_page_only_when_needed(monkeypatch):
+    pages = {"null": make_akas_page(["A", "B"], "c1"), "c1": make_akas_page(["C"], "c2")}
+    cursors = []
+
+    def fake_fetch(url, *, headers=None, session=None, ttl=None, retry=None):
+        cursor = json.loads(parse_qs(urlparse(url).query)["variables"][0])["after"]
+        cursors.append(cursor)
+        return pages[cursor]
+
+    monkeypatch.setattr(imdb, "fetch", fake_fetch)
+    title = make_movie(imdb_id="tt0133093", title="The Matrix")
+    akas = imdb.iter_akas(title)
+    assert [next(akas).title for _ in range(2)] == ["A", "B"]
+    assert cursors == ["null"]
+    assert next(aka for aka in akas if aka.title == "C").country_code == "US"
+    assert cursors == ["null", "c1"]
+    assert title.akas == []
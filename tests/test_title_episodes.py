@@ -1,9 +1,12 @@
 import pytest
 
+import json
 from datetime import date
 from decimal import Decimal
+from urllib.parse import parse_qs, urlparse
 
 from cinemagoerng import web as imdb
+from cinemagoerng.model import Title, TitleType
 
 
 @pytest.mark.parametrize(("imdb_id", "season", "n"), [
@@ -98,3 +101,86 @@ def test_title_episodes_parser_should_set_plot(imdb_id, season, episode, plot):
     imdb.set_episodes(parsed, season=season)
     episode = parsed.episodes[season][episode]
     assert episode.plot["en-US"].startswith(plot)
+
+
+def make_episodes_page(season, n):
+    items = [{"id": f"tt9{season}{i:05d}", "type": "tvEpisode", "titleText": f"Episode {i}",
+              "season": season, "episode": str(i)} for i in range(1, n + 1)]
+    series = {"id": "tt0000100", "titleType": {"id": "tvSeries"}, "originalTitleText": {"text": "Soap"}}
+    page_props = {"contentData": {"entityMetadata": series, "section": {"episodes": {"items": items}}}}
+    data = json.dumps({"props": {"pageProps": page_props}})
+    return f'<script id="__NEXT_DATA__" type="application/json">{data}</script>'.encode()
+
+
+def make_paginated_episodes_page(season, numbers, cursor):
+    edges = [{"node": {
+        "id": f"tt8{season}{i:05d}", "titleType": {"id": "tvEpisode"}, "titleText": {"text": f"Episode {i}"},
+        "series": {"displayableEpisodeNumber": {
+            "displayableSeason": {"displayableProperty": {"value": {"plainText": season}}},
+            "episodeNumber": {"displayableProperty": {"value": {"plainText": str(i)}}},
+        }},
+    }} for i in numbers]
+    page_info = {"hasNextPage": cursor is not None, "endCursor": cursor}
+    data = {"data": {"title": {"episodes": {"episodes": {"edges": edges, "pageInfo": page_info}}}}}
+    return json.dumps(data).encode()
+
+
+def test_title_episodes_should_set_all_seasons_using_graphql_for_full_pages(monkeypatch):
+    def fake_fetch(url, *, headers=None, session=None, ttl=None, retry=None):
+        query = parse_qs(urlparse(url).query)
+        if "variables" not in query:
+            return make_episodes_page(query["season"][0], 2 if query["season"][0] == "1" else 50)
+        variables = json.loads(query["variables"][0])
+        assert variables["filter"] == {"includeSeasons": "2"}
+        if variables["after"] == "null":
+            return make_paginated_episodes_page("2", range(1, 51), "c1")
+        return make_paginated_episodes_page("2", range(51, 76), None)
+
+    monkeypatch.setattr(imdb, "fetch", fake_fetch)
+    series = Title(imdb_id="tt0000100", title="Soap", type_id=TitleType.TV_SERIES, seasons=["1", "2"])
+    imdb.set_all_episodes(series)
+    assert len(series.episodes["1"]) == 2
+    assert len(series.episodes["2"]) == 75
+    assert series.episodes["2"]["75"].imdb_id == "tt8200075"
+    assert series.episodes["2"]["75"].series.imdb_id == "tt0000100"
+
+
+def test_iter_episodes_should_stop_paging_on_early_exit(monkeypatch):
+    cursors = []
+
+    def fake_fetch(url, *, headers=None, session=None, ttl=None, retry=None):
+        variables = json.loads(parse_qs(urlparse(url).query)["variables"][0])
+        cursors.append(variables["after"])
+        return make_paginated_episodes_page("2", range(1, 51), "c1")
+
+    monkeypatch.setattr(imdb, "fetch", fake_fetch)
+    series = Title(imdb_id="tt0000100", title="Soap", type_id=TitleType.TV_SERIES, seasons=["1", "2"])
+    episode = next(e for e in imdb.iter_episodes(series, season="2") if e.episode == "10")
+    assert episode.imdb_id == "tt8200010"
+    assert episode.series.imdb_id == "tt0000100"
+    assert cursors == ["null"]
+    assert not series.episodes
+
+
+def test_title_episodes_should_keep_page_episodes_when_graphql_replies_with_error(monkeypatch):
+    def fake_fetch(url, *, headers=None, session=None, ttl=None, retry=None):
+        query = parse_qs(urlparse(url).query)
+        if "variables" not in query:
+            return make_episodes_page(query["season"][0], 50)
+        return json.dumps({"errors": [{"message": "PersistedQueryNotFound"}], "data": None}).encode()
+
+    monkeypatch.setattr(imdb, "fetch", fake_fetch)
+    series = Title(imdb_id="tt0000100", title="Soap", type_id=TitleType.TV_SERIES, seasons=["1"])
+    imdb.set_episodes(series, season="1")
+    assert len(series.episodes["1"]) == 50
+
+
+def test_iter_episodes_should_raise_pagination_error_when_graphql_replies_with_error(monkeypatch):
+    def fake_fetch(url, *, headers=None, session=None, ttl=None, retry=None):
+        return json.dumps({"errors": [{"message": "PersistedQueryNotFound"}], "data": None}).encode()
+
+    monkeypatch.setattr(imdb, "fetch", fake_fetch)
+    series = Title(imdb_id="tt0000100", title="Soap", type_id=TitleType.TV_SERIES, seasons=["1"])
+    with pytest.raises(imdb.PaginationError) as e:
+        list(imdb.iter_episodes(series, season="1"))
+    assert e.value.cursor is None
@@ -1,8 +1,19 @@
 import pytest
 
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from datetime import date
 from decimal import Decimal
 
+from cinemagoerng import piculet, web
+from cinemagoerng.cache import ResultCache
+from cinemagoerng.model import make_movie
+from cinemagoerng.session import Session
 from cinemagoerng.web import get_title
 
 
@@ -391,3 +402,197 @@ def test_title_reference_parser_should_set_all_crew_members(imdb_id, n, crew):
     assert len(parsed_crew) == n
     if len(crew) > 0:
         assert [(credit.imdb_id, credit.name, credit.job, credit.notes) for credit in parsed_crew] == crew
+
+
+@pytest.mark.parametrize(("imdb_id",), [
+    ("tt0133093",),  # The Matrix
+    ("tt0436992",),  # Doctor Who
+    ("tt1000252",),  # Blink
+])
+def test_title_reference_compiled_spec_should_extract_same_data_as_interpreted_spec(imdb_id):
+    spec = web._spec("title_reference")
+    document = web.fetch(web._get_url(spec, context={"imdb_id": imdb_id}))
+    root = spec.preprocess(piculet.build_tree(document, doctype=spec.doctype))
+    interpreted = replace(spec, _extract=None)
+    assert repr(spec.extract(root)) == repr(interpreted.extract(root))
+
+
+@pytest.mark.parametrize(("document",), [
+    ('{"a": 1',),
+    ('{"a": [1, 2',),
+    ('{"a"',),
+    ("",),
+    ("   ",),
+])
+def test_load_json_should_raise_decode_error_for_truncated_document(document):
+    with pytest.raises(json.JSONDecodeError):
+        piculet.load_json(document, paths={"a": None})
+
+
+def test_load_json_should_accept_byte_order_mark():
+    document = b"\xef\xbb\xbf" + json.dumps({"a": 1, "b": 2}).encode()
+    assert piculet.load_json(document, paths={"a": None}) == {"a": 1}
+
+
+def test_parse_next_data_should_fall_back_to_html_for_truncated_payload():
+    page = b'<html><script id="__NEXT_DATA__">{"props": {"pageProps": </script></html>'
+    with pytest.raises(json.JSONDecodeError):
+        piculet.parse_next_data(page, paths={"props": None})
+
+
+@pytest.mark.parametrize(("imdb_id",), [
+    ("tt0133093",),  # The Matrix
+    ("tt1000252",),  # Blink
+])
+def test_title_reference_lazy_title_should_load_same_credits_as_eager_title(imdb_id):
+    eager = get_title(imdb_id=imdb_id)
+    lazy = get_title(imdb_id=imdb_id, lazy=True)
+    assert "cast" not in vars(lazy)
+    assert lazy.cast == eager.cast
+    assert lazy.crew == eager.crew
+    assert lazy.directors == eager.directors
+
+
+@pytest.mark.parametrize(("imdb_id", "fields"), [
+    ("tt0133093", ["rating", "vote_count"]),  # The Matrix
+    ("tt0133093", ["year", "directors"]),  # The Matrix
+    ("tt1000252", ["series", "crew"]),  # Blink
+])
+def test_title_reference_projected_title_should_set_only_given_fields(imdb_id, fields):
+    full = get_title(imdb_id=imdb_id)
+    parsed = get_title(imdb_id=imdb_id, fields=fields)
+    for field in fields:
+        assert repr(getattr(parsed, field)) == repr(getattr(full, field))
+    assert parsed.genres == []
+
+
+def test_title_reference_projected_title_should_reject_unknown_fields():
+    with pytest.raises(ValueError):
+        get_title(imdb_id="tt0133093", fields=["budget"])
+
+
+def test_get_titles_should_report_failures_without_stopping(monkeypatch):
+    def get_title_or_fail(imdb_id, **kwargs):
+        if imdb_id == "tt0000000":
+            raise LookupError(imdb_id)
+        return make_movie(imdb_id=imdb_id, title=imdb_id)
+
+    monkeypatch.setattr(web, "get_title", get_title_or_fail)
+    results = list(web.get_titles(["tt0133093", "tt0000000", "tt0234215"], max_workers=2))
+    assert {result.imdb_id for result in results} == {"tt0133093", "tt0000000", "tt0234215"}
+    failed = [result for result in results if result.error is not None]
+    assert [result.imdb_id for result in failed] == ["tt0000000"]
+    assert all(result.title.imdb_id == result.imdb_id for result in results if result.error is None)
+
+
+def test_get_titles_should_reject_unknown_data():
+    with pytest.raises(ValueError):
+        list(web.get_titles(["tt0133093"], include=["budget"]))
+
+
+def make_next_data_page(page_props):
+    data = json.dumps({"props": {"pageProps": page_props}})
+    return f'<html><script id="__NEXT_DATA__" type="application/json">{data}</script></html>'.encode()
+
+
+def test_get_title_should_fetch_included_pages_concurrently(monkeypatch):
+    pages = {
+        "reference": make_next_data_page({"aboveTheFoldData": {
+            "id": "tt0133093", "titleType": {"id": "movie"}, "originalTitleText": {"text": "The Matrix"},
+        }}),
+        "taglines": make_next_data_page({"contentData": {"section": {"items": [{"htmlContent": "Free your mind"}]}}}),
+    }
+    barrier = threading.Barrier(2, timeout=5)
+
+    def fetch_together(url, *, headers=None, session=None, ttl=None, retry=None):
+        barrier.wait()
+        return pages[url.rstrip("/").rsplit("/", 1)[-1]]
+
+    monkeypatch.setattr(web, "fetch", fetch_together)
+    parsed = get_title(imdb_id="tt0133093", include=["taglines"])
+    assert parsed.title == "The Matrix"
+    assert parsed.taglines == ["Free your mind"]
+
+
+def test_get_title_should_get_scraped_data_from_result_cache(monkeypatch):
+    page = make_next_data_page({"aboveTheFoldData": {
+        "id": "tt0133093", "titleType": {"id": "movie"}, "originalTitleText": {"text": "The Matrix"},
+    }})
+    urls = []
+
+    def fake_fetch(url, *, headers=None, session=None, ttl=None, retry=None):
+        urls.append(url)
+        return page
+
+    monkeypatch.setattr(web, "fetch", fake_fetch)
+    with Session(result_cache=ResultCache()) as session:
+        titles = [get_title(imdb_id="tt0133093", session=session) for _ in range(2)]
+        get_title(imdb_id="tt0133093", fields=["year"], session=session)
+    assert [title.title for title in titles] == ["The Matrix", "The Matrix"]
+    assert titles[0] is not titles[1]
+    assert len(urls) == 2
+
+
+def test_get_title_should_refresh_stale_result_in_background(monkeypatch):
+    titles = iter(["The Matrix", "The Matrix Reloaded"])
+
+    def fake_fetch(url, *, headers=None, session=None, ttl=None, retry=None):
+        return make_next_data_page({"aboveTheFoldData": {
+            "id": "tt0133093", "titleType": {"id": "movie"}, "originalTitleText": {"text": next(titles)},
+        }})
+
+    monkeypatch.setattr(web, "fetch", fake_fetch)
+    cache = ResultCache(ttl=0.0, stale_ttl=60.0)
+    request = web.make_request(web._spec("title_reference"), context={"imdb_id": "tt0133093"})
+    with Session(result_cache=cache) as session:
+        assert get_title(imdb_id="tt0133093", session=session).title == "The Matrix"
+        assert get_title(imdb_id="tt0133093", session=session).title == "The Matrix"
+        for _ in range(500):
+            data, stale = cache.get(web.result_key(request))
+            if data["title"] == "The Matrix Reloaded":
+                break
+            time.sleep(0.01)
+    assert (data["title"], stale) == ("The Matrix Reloaded", True)
+
+
+def test_result_key_should_change_with_spec_version():
+    spec = web._spec("title_reference")
+    request = web.make_request(spec, context={"imdb_id": "tt0133093"})
+    newer = web.make_request(replace(spec, version="99999999"), context={"imdb_id": "tt0133093"})
+    assert web.result_key(request) != web.result_key(newer)
+
+
+_COMPUTED_KEY_RESULT_KEY = """
+from cinemagoerng import piculet, registry, web
+content = {"version": "1", "url": "https://www.imdb.com/title/%(imdb_id)s/", "doctype": "html", "rules": [
+    {"key": {"path": "//h1/@id", "transforms": ["lower"]}, "extractor": {"path": "//h1/text()"}},
+]}
+spec = piculet.load_spec(content, type_=web.Spec, transformers=registry.transformers)
+print(web.result_key(web.make_request(spec, context={"imdb_id": "tt0133093"})))
+"""
+
+
+def test_result_key_should_be_same_in_all_processes_for_computed_keys():
+    keys = {subprocess.run([sys.executable, "-c", _COMPUTED_KEY_RESULT_KEY], capture_output=True, check=True,
+                           text=True).stdout for _ in range(2)}
+    assert len(keys) == 1
+    assert keys.pop().split("\n")[1] == "//h1/@id|lower"
+
+
+def test_get_title_should_coalesce_concurrent_requests_for_same_title(monkeypatch):
+    urls = []
+
+    def slow_fetch(url, *, headers=None, session=None, ttl=None, retry=None):
+        urls.append(url)
+        time.sleep(0.2)
+        return make_next_data_page({"aboveTheFoldData": {
+            "id": "tt0133093", "titleType": {"id": "movie"}, "originalTitleText": {"text": "The Matrix"},
+        }})
+
+    monkeypatch.setattr(web, "fetch", slow_fetch)
+    with Session() as session, ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(get_title, imdb_id="tt0133093", lazy=True, session=session) for _ in range(4)]
+        titles = [future.result() for future in futures]
+    assert len(urls) == 1
+    assert [title.title for title in titles] == ["The Matrix"] * 4
+    assert len({id(title) for title in titles}) == 4